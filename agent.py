@@ -4,29 +4,83 @@ from __future__ import annotations
 
 import asyncio
 import json
+import sys
 from collections import deque
-from typing import Any, Deque, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List
 
 import yaml
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from openai.types.responses import ResponseTextDeltaEvent
+from pydantic import BaseModel
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 from agents import Agent, AgentHooks, Runner, RunContextWrapper, function_tool, set_tracing_disabled
 from agents.memory.session import SessionABC
 from agents.items import TResponseInputItem
 
-from state import TravelState, today_iso_utc
+from state import MemoryNote, TravelState, today_iso_utc
+from logger import get_logger
 from pricing import search_flights, search_hotels, get_airport_code
 
 # Disable tracing for cleaner output
 set_tracing_disabled(True)
 
-ROLE_USER = "user"
+logger = get_logger(__name__)
+
+# Interned so comparisons against API-provided (typically interned) keys/values
+# hit the identity fast path inside str ==
+ROLE_USER = sys.intern("user")
+_ROLE_KEY = sys.intern("role")
+
+# libyaml-backed dumper when available (same output, C speed)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize to a compact UTF-8 JSON string (orjson when installed)."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _json_loads(text: str | bytes) -> Any:
+    """Parse JSON text (orjson when installed)."""
+    if HAS_ORJSON:
+        return orjson.loads(text)
+    return json.loads(text)
 
 
 # ============================================================================
 # Memory Tools
 # ============================================================================
 
+def _make_note(text: str, keywords: List[str], last_update_date: str) -> Dict[str, Any]:
+    """Build a session note record with normalized keywords."""
+    # Single pass, stops at 3 tags; no throwaway full list or double strip()
+    clean_keywords: List[str] = []
+    for k in keywords:
+        if isinstance(k, str):
+            k = k.strip()
+            if k:
+                clean_keywords.append(k.lower())
+                if len(clean_keywords) == 3:
+                    break
+
+    return {
+        "text": text.strip(),
+        "last_update_date": last_update_date,
+        "keywords": clean_keywords,
+    }
+
+
 @function_tool
 def save_memory_note(
     ctx: RunContextWrapper[TravelState],
@@ -68,30 +122,79 @@ def save_memory_note(
 
     Safety (non-negotiable)
     - Never store sensitive PII: passport numbers, payment details, SSNs, full DOB, addresses.
+
+    To record more than one note in the same turn, call `save_memory_notes` once instead.
     """
-    if "notes" not in ctx.context.session_memory or ctx.context.session_memory["notes"] is None:
-        ctx.context.session_memory["notes"] = []
+    ctx.context.session_memory["notes"].append(_make_note(text, keywords, today_iso_utc()))
+    return {"ok": True}
 
-    clean_keywords = [
-        k.strip().lower()
-        for k in keywords
-        if isinstance(k, str) and k.strip()
-    ][:3]
 
-    ctx.context.session_memory["notes"].append({
-        "text": text.strip(),
-        "last_update_date": today_iso_utc(),
-        "keywords": clean_keywords,
-    })
-    return {"ok": True}
+class MemoryNoteInput(BaseModel):
+    """One note passed to `save_memory_notes`."""
+    text: str
+    keywords: List[str]
+
+
+@function_tool
+def save_memory_notes(
+    ctx: RunContextWrapper[TravelState],
+    notes: List[MemoryNoteInput],
+) -> dict:
+    """
+    Save several candidate memory notes into state.session_memory.notes in one call.
+
+    Prefer this over repeated `save_memory_note` calls whenever you have more than one
+    note to record in a turn. Every note follows the same rules as `save_memory_note`:
+    durable, actionable, explicitly stated by the user, 1-2 sentences, 1-3 lowercase
+    one-word keywords, and never any sensitive PII.
+
+    Args:
+        notes: The notes to save, each with `text` and `keywords`.
+    """
+    today = today_iso_utc()
+    ctx.context.session_memory["notes"].extend([
+        _make_note(n.text, n.keywords, today) for n in notes
+    ])
+    return {"ok": True, "saved": len(notes)}
 
 
 # ============================================================================
 # Travel Search Tools (Amadeus API)
 # ============================================================================
 
+# The Amadeus SDK is blocking; run its calls here so tool calls made in the
+# same turn (e.g. flights + hotels) overlap instead of stalling the event loop.
+# Module-level rather than a loop's default executor, so the same pool serves
+# whichever loop runs the agent (the app's persistent one or a script's asyncio.run).
+_TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="travel-tools")
+
+
+# Tool results are kept in session history and re-sent on every later turn
+MAX_TOOL_OUTPUT_CHARS = 8000
+
+
+async def _run_blocking(fn: Callable[..., dict], **kwargs: Any) -> dict:
+    """Run a blocking pricing call on the tool thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_TOOL_EXECUTOR, partial(fn, **kwargs))
+
+
+def _truncate_tool_output(result: dict, limit: int = MAX_TOOL_OUTPUT_CHARS) -> dict:
+    """Cap a tool result's serialized size, keeping its head and tail around an elision."""
+    serialized = _json_dumps(result)
+    if len(serialized) <= limit:
+        return result
+    half = limit // 2
+    return {
+        "truncated": True,
+        "original_chars": len(serialized),
+        "head": serialized[:half],
+        "tail": serialized[-half:],
+    }
+
+
 @function_tool
-def search_flight_offers(
+async def search_flight_offers(
     ctx: RunContextWrapper[TravelState],
     origin: str,
     destination: str,
@@ -125,7 +228,8 @@ def search_flight_offers(
     Returns:
         Dictionary with flight offers including prices, airlines, schedules, and booking links
     """
-    return search_flights(
+    return _truncate_tool_output(await _run_blocking(
+        search_flights,
         origin=origin,
         destination=destination,
         departure_date=departure_date,
@@ -133,11 +237,11 @@ def search_flight_offers(
         adults=adults,
         cabin_class=cabin_class,
         max_results=5,
-    )
+    ))
 
 
 @function_tool
-def search_hotel_offers(
+async def search_hotel_offers(
     ctx: RunContextWrapper[TravelState],
     city_code: str,
     check_in_date: str,
@@ -167,18 +271,19 @@ def search_hotel_offers(
     Returns:
         Dictionary with hotel offers including prices, ratings, amenities, and booking links
     """
-    return search_hotels(
+    return _truncate_tool_output(await _run_blocking(
+        search_hotels,
         city_code=city_code,
         check_in_date=check_in_date,
         check_out_date=check_out_date,
         adults=adults,
         rooms=rooms,
         max_results=5,
-    )
+    ))
 
 
 @function_tool
-def lookup_airport_code(
+async def lookup_airport_code(
     ctx: RunContextWrapper[TravelState],
     city_name: str,
 ) -> dict:
@@ -197,7 +302,7 @@ def lookup_airport_code(
     Returns:
         Dictionary with matching airport codes and details
     """
-    return get_airport_code(city_name)
+    return _truncate_tool_output(await _run_blocking(get_airport_code, city_name=city_name))
 
 
 # ============================================================================
@@ -206,65 +311,86 @@ def lookup_airport_code(
 
 def _is_user_msg(item: TResponseInputItem) -> bool:
     """Return True if the item represents a user message."""
-    if isinstance(item, dict):
-        role = item.get("role")
-        if role is not None:
-            return role == ROLE_USER
-        if item.get("type") == "message":
-            return item.get("role") == ROLE_USER
-    return getattr(item, "role", None) == ROLE_USER
+    # Plain dicts are the common case; `type() is` skips the isinstance MRO walk.
+    # A dict without "role" (e.g. a typed "message" item) is never a user message.
+    if type(item) is dict or isinstance(item, dict):
+        return item.get(_ROLE_KEY) == ROLE_USER
+    return getattr(item, _ROLE_KEY, None) == ROLE_USER
 
 
 class TrimmingSession(SessionABC):
-    """Keep only the last N user turns in memory."""
+    """
+    Keep only the last N user turns in memory.
 
-    def __init__(self, session_id: str, state: TravelState, max_turns: int = 8):
+    History may grow to `max_turns + chunk_size` user turns before it is cut back
+    to `max_turns` in one step, so the history prefix stays stable between trims
+    (friendlier to prompt caching) and trimming work is amortized.
+    """
+
+    def __init__(self, session_id: str, state: TravelState, max_turns: int = 8, chunk_size: int = 4):
         self.session_id = session_id
         self.state = state
         self.max_turns = max(1, int(max_turns))
+        self.chunk_size = max(0, int(chunk_size))
         self._items: Deque[TResponseInputItem] = deque()
+        # Logical positions of user messages; `_base_offset` is the position of `_items[0]`
+        self._user_positions: Deque[int] = deque()
+        self._base_offset = 0
+        # Immutable copy of `_items`, republished under the lock after every write
+        self._snapshot: tuple = ()
         self._lock = asyncio.Lock()
 
     async def get_items(self, limit: int | None = None) -> List[TResponseInputItem]:
-        async with self._lock:
-            trimmed = self._trim_to_last_turns(list(self._items))
-            return trimmed[-limit:] if (limit is not None and limit >= 0) else trimmed
+        # Lock-free: the snapshot tuple is replaced wholesale, never mutated
+        snap = self._snapshot
+        if not limit or limit < 0:
+            return list(snap)
+        return list(snap[-limit:])
 
     async def add_items(self, items: List[TResponseInputItem]) -> None:
         if not items:
             return
         async with self._lock:
+            next_pos = self._base_offset + len(self._items)
+            for i, item in enumerate(items):
+                if _is_user_msg(item):
+                    self._user_positions.append(next_pos + i)
             self._items.extend(items)
-            original_len = len(self._items)
-            trimmed = self._trim_to_last_turns(list(self._items))
-            if len(trimmed) < original_len:
+
+            if self._trim_to_last_turns():
                 self.state.inject_session_memories_next_turn = True
-            self._items.clear()
-            self._items.extend(trimmed)
+            self._snapshot = tuple(self._items)
 
     async def pop_item(self) -> TResponseInputItem | None:
         async with self._lock:
-            return self._items.pop() if self._items else None
+            if not self._items:
+                return None
+            item = self._items.pop()
+            if self._user_positions and self._user_positions[-1] == self._base_offset + len(self._items):
+                self._user_positions.pop()
+            self._snapshot = tuple(self._items)
+            return item
 
     async def clear_session(self) -> None:
         async with self._lock:
             self._items.clear()
+            self._user_positions.clear()
+            self._base_offset = 0
+            self._snapshot = ()
 
-    def _trim_to_last_turns(self, items: List[TResponseInputItem]) -> List[TResponseInputItem]:
-        if not items:
-            return items
-
-        count = 0
-        start_idx = 0
+    def _trim_to_last_turns(self) -> int:
+        """Once over the chunk bound, drop items older than the Kth-from-last user message. Returns the number dropped."""
+        if len(self._user_positions) <= self.max_turns + self.chunk_size:
+            return 0
 
-        for i in range(len(items) - 1, -1, -1):
-            if _is_user_msg(items[i]):
-                count += 1
-                if count == self.max_turns:
-                    start_idx = i
-                    break
+        while len(self._user_positions) > self.max_turns:
+            self._user_positions.popleft()
 
-        return items[start_idx:]
+        drop_count = self._user_positions[0] - self._base_offset
+        for _ in range(drop_count):
+            self._items.popleft()
+        self._base_offset += drop_count
+        return drop_count
 
 
 # ============================================================================
@@ -274,16 +400,15 @@ class TrimmingSession(SessionABC):
 def render_frontmatter(profile: dict) -> str:
     """Render user profile as YAML frontmatter."""
     payload = {"profile": profile}
-    y = yaml.safe_dump(payload, sort_keys=False).strip()
+    y = yaml.dump(payload, Dumper=_YAML_DUMPER, sort_keys=False).strip()
     return f"---\n{y}\n---"
 
 
 def render_global_memories_md(global_notes: list[dict], k: int = 6) -> str:
-    """Render global memory notes as markdown list."""
+    """Render global memory notes as markdown list (notes are kept newest-first, see TravelState.sort_global_notes)."""
     if not global_notes:
         return "- (none)"
-    notes_sorted = sorted(global_notes, key=lambda n: n.get("last_update_date", ""), reverse=True)
-    top = notes_sorted[:k]
+    top = global_notes[:k]
     return "\n".join([f"- {n['text']}" for n in top])
 
 
@@ -353,6 +478,31 @@ Guidelines:
 """
 
 
+# Static pieces interleaved with the dynamic parts of the instruction string
+_INSTR_PARTS = (
+    "\n\n<user_profile>\n",
+    "\n</user_profile>\n\n<memories>\nGLOBAL memory:\n",
+    "\n</memories>\n\n" + MEMORY_INSTRUCTIONS,
+)
+
+# Formatted BASE_INSTRUCTIONS_TEMPLATE for the current local day
+_base_cache: dict[date, str] = {}
+
+
+def _base_instructions_for(now: datetime) -> str:
+    """Return the base instructions formatted for `now`'s date, reformatting only when the day changes."""
+    today = now.date()
+    cached = _base_cache.get(today)
+    if cached is None:
+        cached = BASE_INSTRUCTIONS_TEMPLATE.format(
+            current_date=now.strftime("%B %d, %Y"),  # e.g., "January 15, 2026"
+            current_year=now.year,
+        )
+        _base_cache.clear()
+        _base_cache[today] = cached
+    return cached
+
+
 # ============================================================================
 # Hooks
 # ============================================================================
@@ -362,12 +512,34 @@ class MemoryHooks(AgentHooks[TravelState]):
 
     def __init__(self, client: OpenAI):
         self.client = client
+        # (profile, profile_version, rendered) - holds the profile itself so identity can't be reused
+        self._fm_cache: tuple[dict, int, str] | None = None
+        # (notes, global_memory version, k, rendered)
+        self._gm_cache: tuple[list, int, int, str] | None = None
+
+    def _frontmatter(self, state: TravelState) -> str:
+        profile = state.profile
+        cached = self._fm_cache
+        if cached is not None and cached[0] is profile and cached[1] == state.profile_version:
+            return cached[2]
+        rendered = render_frontmatter(profile)
+        self._fm_cache = (profile, state.profile_version, rendered)
+        return rendered
+
+    def _global_memories(self, state: TravelState, k: int = 6) -> str:
+        global_memory = state.global_memory or {}
+        notes = global_memory.get("notes", [])
+        version = global_memory.get("version", 0)
+        cached = self._gm_cache
+        if cached is not None and cached[0] is notes and cached[1] == version and cached[2] == k:
+            return cached[3]
+        rendered = render_global_memories_md(notes, k=k)
+        self._gm_cache = (notes, version, k, rendered)
+        return rendered
 
     async def on_start(self, ctx: RunContextWrapper[TravelState], agent: Agent) -> None:
-        ctx.context.system_frontmatter = render_frontmatter(ctx.context.profile)
-        ctx.context.global_memories_md = render_global_memories_md(
-            (ctx.context.global_memory or {}).get("notes", [])
-        )
+        ctx.context.system_frontmatter = self._frontmatter(ctx.context)
+        ctx.context.global_memories_md = self._global_memories(ctx.context)
 
         if ctx.context.inject_session_memories_next_turn:
             ctx.context.session_memories_md = render_session_memories_md(
@@ -383,20 +555,9 @@ class MemoryHooks(AgentHooks[TravelState]):
 
 async def build_instructions(ctx: RunContextWrapper[TravelState], agent: Agent) -> str:
     """Build dynamic instructions with memory injection."""
-    from datetime import datetime
-
     s = ctx.context
 
-    # Get current date for the instructions
-    now = datetime.now()
-    current_date = now.strftime("%B %d, %Y")  # e.g., "January 15, 2026"
-    current_year = now.year
-
-    if s.inject_session_memories_next_turn and not s.session_memories_md:
-        s.session_memories_md = render_session_memories_md(
-            (s.session_memory or {}).get("notes", [])
-        )
-
+    # MemoryHooks.on_start renders session memories whenever injection is flagged
     session_block = ""
     if s.inject_session_memories_next_turn and s.session_memories_md:
         session_block = (
@@ -406,45 +567,28 @@ async def build_instructions(ctx: RunContextWrapper[TravelState], agent: Agent)
         s.inject_session_memories_next_turn = False
         s.session_memories_md = ""
 
-    # Format the base instructions with current date
-    base_instructions = BASE_INSTRUCTIONS_TEMPLATE.format(
-        current_date=current_date,
-        current_year=current_year
-    )
+    # Base instructions with current date (formatted once per day)
+    base_instructions = _base_instructions_for(datetime.now())
 
-    return (
-        base_instructions
-        + "\n\n<user_profile>\n" + (s.system_frontmatter or "") + "\n</user_profile>"
-        + "\n\n<memories>\n"
-        + "GLOBAL memory:\n" + (s.global_memories_md or "- (none)")
-        + session_block
-        + "\n</memories>"
-        + "\n\n" + MEMORY_INSTRUCTIONS
-    )
+    return "".join((
+        base_instructions,
+        _INSTR_PARTS[0], s.system_frontmatter or "",
+        _INSTR_PARTS[1], s.global_memories_md or "- (none)",
+        session_block,
+        _INSTR_PARTS[2],
+    ))
 
 
 # ============================================================================
 # Memory Consolidation
 # ============================================================================
 
-def consolidate_memory(state: TravelState, client: OpenAI, model: str = "gpt-4o-mini") -> None:
-    """
-    Consolidate session_memory notes into global_memory notes.
-
-    - Merges duplicates / near-duplicates
-    - Resolves conflicts by keeping most recent
-    - Clears session notes after consolidation
-    """
-    session_notes: List[Dict[str, Any]] = state.session_memory.get("notes", []) or []
-    if not session_notes:
-        return
-
-    global_notes: List[Dict[str, Any]] = state.global_memory.get("notes", []) or []
-
-    global_json = json.dumps(global_notes, ensure_ascii=False)
-    session_json = json.dumps(session_notes, ensure_ascii=False)
+def _build_consolidation_prompt(global_notes: List[Dict[str, Any]], session_notes: List[Dict[str, Any]]) -> str:
+    """Build the LLM prompt that merges session notes into global notes."""
+    global_json = _json_dumps(global_notes)
+    session_json = _json_dumps(session_notes)
 
-    consolidation_prompt = f"""
+    return f"""
     You are consolidating travel memory notes into LONG-TERM (GLOBAL) memory.
 
     You will receive two JSON arrays:
@@ -463,8 +607,8 @@ def consolidate_memory(state: TravelState, client: OpenAI, model: str = "gpt-4o-
     6) Do NOT invent new facts.
 
     OUTPUT FORMAT (STRICT)
-    Return ONLY a valid JSON array.
-    Each element MUST be an object with EXACTLY these keys:
+    Return ONLY a valid JSON object of the form {{"notes": [...]}}.
+    Each element of "notes" MUST be an object with EXACTLY these keys:
     {{"text": string, "last_update_date": "YYYY-MM-DD", "keywords": [string]}}
 
     Do not include markdown, commentary, code fences, or extra keys.
@@ -480,25 +624,106 @@ def consolidate_memory(state: TravelState, client: OpenAI, model: str = "gpt-4o-
     </SESSION_JSON>
     """.strip()
 
-    resp = client.chat.completions.create(
-        model=model,
-        messages=[{"role": "user", "content": consolidation_prompt}],
-    )
 
-    consolidated_text = (resp.choices[0].message.content or "").strip()
+def _validate_notes(raw: Any) -> List[Dict[str, Any]] | None:
+    """Return `raw` normalized to note dicts, or None if it isn't a list of well-formed notes."""
+    if not isinstance(raw, list):
+        logger.warning("Consolidation JSON has no notes list, keeping notes unmerged")
+        return None
+    notes: List[Dict[str, Any]] = []
+    for item in raw:
+        note = MemoryNote.validate(item)
+        if note is None:
+            logger.warning(f"Consolidation returned a malformed note, keeping notes unmerged: {item!r}")
+            return None
+        notes.append(note.to_dict())
+    return notes
+
 
+def _apply_consolidation(
+    state: TravelState,
+    global_notes: List[Dict[str, Any]],
+    session_notes: List[Dict[str, Any]],
+    consolidated_text: str,
+) -> None:
+    """Write the consolidated notes into state and clear session notes."""
+    consolidated_notes: Any = None
     try:
-        consolidated_notes = json.loads(consolidated_text)
-        if isinstance(consolidated_notes, list):
-            state.global_memory["notes"] = consolidated_notes
-        else:
-            state.global_memory["notes"] = global_notes + session_notes
-    except Exception:
+        # Both orjson.JSONDecodeError and json.JSONDecodeError subclass ValueError
+        parsed = _json_loads(consolidated_text)
+    except ValueError as e:
+        logger.warning(f"Consolidation returned invalid JSON, keeping notes unmerged: {e}")
+    else:
+        consolidated_notes = _validate_notes(parsed.get("notes") if isinstance(parsed, dict) else parsed)
+
+    if consolidated_notes is not None:
+        state.global_memory["notes"] = consolidated_notes
+    else:
         state.global_memory["notes"] = global_notes + session_notes
 
+    state.sort_global_notes()
+    state.bump_global_memory_version()
     state.session_memory["notes"] = []
 
 
+def _consolidation_request(
+    global_notes: List[Dict[str, Any]],
+    session_notes: List[Dict[str, Any]],
+    model: str,
+) -> Dict[str, Any]:
+    """Keyword arguments for the consolidation chat completion (JSON mode)."""
+    return {
+        "model": model,
+        "messages": [{"role": "user", "content": _build_consolidation_prompt(global_notes, session_notes)}],
+        "response_format": {"type": "json_object"},
+    }
+
+
+def consolidate_memory(state: TravelState, client: OpenAI, model: str = "gpt-4o-mini") -> None:
+    """
+    Consolidate session_memory notes into global_memory notes.
+
+    - Merges duplicates / near-duplicates
+    - Resolves conflicts by keeping most recent
+    - Clears session notes after consolidation
+    """
+    session_notes: List[Dict[str, Any]] = state.session_memory.get("notes", []) or []
+    if not session_notes:
+        return
+
+    global_notes: List[Dict[str, Any]] = state.global_memory.get("notes", []) or []
+
+    resp = client.chat.completions.create(**_consolidation_request(global_notes, session_notes, model))
+
+    _apply_consolidation(state, global_notes, session_notes, resp.choices[0].message.content or "")
+
+
+async def consolidate_memory_async(
+    state: TravelState,
+    client: AsyncOpenAI | OpenAI,
+    model: str = "gpt-4o-mini",
+) -> None:
+    """
+    Non-blocking variant of `consolidate_memory`.
+
+    Awaits the completion directly with an `AsyncOpenAI` client; a sync `OpenAI`
+    client is pushed to a worker thread so the event loop stays free either way.
+    """
+    session_notes: List[Dict[str, Any]] = state.session_memory.get("notes", []) or []
+    if not session_notes:
+        return
+
+    global_notes: List[Dict[str, Any]] = state.global_memory.get("notes", []) or []
+
+    request = _consolidation_request(global_notes, session_notes, model)
+    if isinstance(client, AsyncOpenAI):
+        resp = await client.chat.completions.create(**request)
+    else:
+        resp = await asyncio.to_thread(client.chat.completions.create, **request)
+
+    _apply_consolidation(state, global_notes, session_notes, resp.choices[0].message.content or "")
+
+
 # ============================================================================
 # Agent Factory
 # ============================================================================
@@ -512,6 +737,7 @@ def create_travel_agent(client: OpenAI) -> Agent:
         hooks=MemoryHooks(client),
         tools=[
             save_memory_note,
+            save_memory_notes,
             search_flight_offers,
             search_hotel_offers,
             lookup_airport_code,
@@ -519,9 +745,14 @@ def create_travel_agent(client: OpenAI) -> Agent:
     )
 
 
-def create_session(state: TravelState, session_id: str = "default", max_turns: int = 20) -> TrimmingSession:
+def create_session(
+    state: TravelState,
+    session_id: str = "default",
+    max_turns: int = 20,
+    chunk_size: int = 4,
+) -> TrimmingSession:
     """Create a trimming session for the agent."""
-    return TrimmingSession(session_id, state, max_turns=max_turns)
+    return TrimmingSession(session_id, state, max_turns=max_turns, chunk_size=chunk_size)
 
 
 async def run_agent_turn(
@@ -530,7 +761,7 @@ async def run_agent_turn(
     state: TravelState,
     user_input: str,
 ) -> str:
-    """Run a single turn of the agent and return the response."""
+    """Run a single turn of the agent and return the response (non-streaming public API)."""
     result = await Runner.run(
         agent,
         input=user_input,
@@ -538,3 +769,22 @@ async def run_agent_turn(
         context=state,
     )
     return result.final_output
+
+
+async def run_agent_turn_stream(
+    agent: Agent,
+    session: TrimmingSession,
+    state: TravelState,
+    user_input: str,
+) -> AsyncIterator[str]:
+    """Run a single turn of the agent, yielding response text as it is generated."""
+    result = Runner.run_streamed(
+        agent,
+        input=user_input,
+        session=session,
+        context=state,
+    )
+    async for event in result.stream_events():
+        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+            yield event.data.delta
+
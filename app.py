@@ -1,21 +1,31 @@
 """Streamlit web app for Travel Concierge Agent."""
 
+from __future__ import annotations
+
 import asyncio
+import concurrent.futures
 import os
+import threading
 import traceback
+from typing import TYPE_CHECKING
 
 import streamlit as st
-from dotenv import load_dotenv
-from openai import OpenAI
 
-from agent import create_travel_agent, create_session, run_agent_turn, consolidate_memory
-from storage import load_user_state, save_user_state
+from storage import get_user_file_path, load_user_state, save_user_state
 from state import TravelState
-from logger import setup_logging, get_logger, read_logs, read_errors, clear_logs, get_log_stats
+from logger import setup_logging, get_logger, read_logs_and_errors, clear_logs, get_log_stats
 from auth import authenticate, create_user, get_user_display_name, ensure_default_user
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+# openai and agent (httpx, pydantic, the Agents SDK) are imported on first use
+# so the login page doesn't pay for them.
+
 # Load environment variables (for local development)
-load_dotenv()
+if not os.environ.get("STREAMLIT_CLOUD"):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 
 def get_secret(key: str, default: str = None) -> str:
@@ -29,12 +39,16 @@ def get_secret(key: str, default: str = None) -> str:
     # Fall back to environment variables (for local development)
     return os.getenv(key, default)
 
-# Setup logging
-setup_logging()
-logger = get_logger(__name__)
+@st.cache_resource(show_spinner=False)
+def _bootstrap():
+    """One-time process setup: logging handlers and the default user."""
+    setup_logging()
+    ensure_default_user()
+    return get_logger(__name__)
 
-# Ensure default user exists
-ensure_default_user()
+
+# Streamlit re-executes this file on every rerun; the setup runs once per process
+logger = _bootstrap()
 
 # Page config
 st.set_page_config(
@@ -43,6 +57,26 @@ st.set_page_config(
     layout="centered",
 )
 
+# Form option lists with value -> index lookups (built once, not per rerun)
+CURRENCIES = ("USD", "EUR", "GBP", "CAD", "AUD", "JPY")
+CURRENCY_IDX = {v: i for i, v in enumerate(CURRENCIES)}
+SEAT_OPTS = ("aisle", "window", "middle")
+SEAT_IDX = {v: i for i, v in enumerate(SEAT_OPTS)}
+DEP_TIME_OPTS = ("morning", "afternoon", "evening", "no preference")
+DEP_TIME_IDX = {v: i for i, v in enumerate(DEP_TIME_OPTS)}
+CABIN_OPTS = ("economy", "premium_economy", "business", "first")
+CABIN_IDX = {v: i for i, v in enumerate(CABIN_OPTS)}
+MIN_STARS_OPTS = (1, 2, 3, 4, 5)
+MIN_STARS_IDX = {v: i for i, v in enumerate(MIN_STARS_OPTS)}
+BED_TYPE_OPTS = ("king", "queen", "double", "twin", "no preference")
+BED_TYPE_IDX = {v: i for i, v in enumerate(BED_TYPE_OPTS)}
+CAR_SIZE_OPTS = ("compact", "midsize", "full-size", "suv", "luxury", "minivan")
+CAR_SIZE_IDX = {v: i for i, v in enumerate(CAR_SIZE_OPTS)}
+TONE_OPTS = ("concise and friendly", "detailed and formal", "casual")
+TONE_IDX = {v: i for i, v in enumerate(TONE_OPTS)}
+MAX_LAYOVER_OPTS = (0, 1, 2, 3)
+MAX_LAYOVER_IDX = {v: i for i, v in enumerate(MAX_LAYOVER_OPTS)}
+
 
 def display_login_page():
     """Display login and registration forms."""
@@ -89,17 +123,71 @@ def display_login_page():
                         st.error(message)
 
 
-def get_openai_client() -> OpenAI:
-    """Get or create OpenAI client."""
+def _get_openai_api_key() -> str:
+    """Get the OpenAI API key, stopping the app with an error if it is missing."""
     api_key = get_secret("OPENAI_API_KEY")
     if not api_key:
         logger.error("OPENAI_API_KEY not found")
         st.error("OPENAI_API_KEY not found. Please add it to Streamlit secrets or .env file.")
         st.stop()
+    return api_key
+
+
+@st.cache_resource
+def _create_openai_client(api_key: str) -> OpenAI:
+    """Process-wide OpenAI client (shares one HTTP connection pool across sessions)."""
+    from openai import OpenAI
+
     logger.info("OpenAI client initialized")
     return OpenAI(api_key=api_key)
 
 
+@st.cache_resource
+def _build_agent(api_key: str):
+    """Process-wide Travel Concierge agent; per-user data lives in TravelState, not the agent."""
+    from agent import create_travel_agent
+
+    return create_travel_agent(_create_openai_client(api_key))
+
+
+def get_openai_client() -> OpenAI:
+    """Get the shared OpenAI client."""
+    return _create_openai_client(_get_openai_api_key())
+
+
+@st.cache_data(max_entries=64)
+def _cached_load_user_state(user_id: str, mtime_ns: int) -> TravelState:
+    """Parsed user state, keyed on file mtime so a save invalidates it."""
+    return load_user_state(user_id)
+
+
+# Upper bound on how long a login waits for that user's logout consolidation
+CONSOLIDATION_WAIT_SECONDS = 60
+
+
+@st.cache_resource
+def _pending_consolidations() -> dict[str, concurrent.futures.Future]:
+    """Logout consolidations still in flight, by user_id (process-wide)."""
+    return {}
+
+
+def _load_user_state(user_id: str) -> TravelState:
+    """Load user state, reusing the parsed copy while the file is unchanged."""
+    pending = _pending_consolidations().get(user_id)
+    if pending is not None:
+        # Loading before the merge is saved would let this session overwrite it
+        try:
+            pending.result(timeout=CONSOLIDATION_WAIT_SECONDS)
+        except concurrent.futures.TimeoutError:
+            logger.warning(f"Consolidation for {user_id} still running; loading unmerged state")
+    try:
+        mtime_ns = get_user_file_path(user_id).stat().st_mtime_ns
+    except FileNotFoundError:
+        # New user: load_user_state creates and saves the default state
+        return load_user_state(user_id)
+    return _cached_load_user_state(user_id, mtime_ns)
+
+
 def init_session_state():
     """Initialize Streamlit session state."""
     # Use the authenticated username as user_id
@@ -122,29 +210,491 @@ def init_session_state():
         st.session_state.messages = []
 
     if "user_state" not in st.session_state:
-        st.session_state.user_state = load_user_state(st.session_state.user_id)
-
-    if "client" not in st.session_state:
-        st.session_state.client = get_openai_client()
+        st.session_state.user_state = _load_user_state(st.session_state.user_id)
 
-    if "agent" not in st.session_state:
-        st.session_state.agent = create_travel_agent(st.session_state.client)
+    api_key = _get_openai_api_key()
+    st.session_state.agent = _build_agent(api_key)
 
     if "session" not in st.session_state:
+        from agent import create_session
+
         st.session_state.session = create_session(
             st.session_state.user_state,
             session_id=st.session_state.user_id,
         )
 
 
-def run_async(coro):
-    """Run async function in sync context."""
+@st.cache_resource
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """Process-wide event loop running on a daemon thread.
+
+    Keeping one loop alive lets the async OpenAI/Agents HTTP connection pools
+    survive between turns instead of being torn down with a per-turn loop.
+    """
     loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    threading.Thread(target=loop.run_forever, name="agent-event-loop", daemon=True).start()
+    return loop
+
+
+async def _consolidate_and_persist(user_id: str, state: TravelState, client: OpenAI) -> None:
+    """Fold session notes into global memory and save; scheduled at logout, off the rerun."""
+    from agent import consolidate_memory_async
+
+    try:
+        await consolidate_memory_async(state, client)
+    except Exception as e:
+        logger.error(f"Background consolidation failed for {user_id}: {e}")
+        return
+    try:
+        await asyncio.to_thread(save_user_state, user_id, state)
+    except Exception as e:
+        logger.error(f"Saving consolidated memories failed for {user_id}: {e}")
+        return
+    logger.info(f"Session memories consolidated for {user_id}")
+
+
+def _schedule_consolidation(user_id: str, state: TravelState) -> None:
+    """Run `_consolidate_and_persist` on the shared loop; logins for `user_id` wait on it."""
+    pending = _pending_consolidations()
+    future = asyncio.run_coroutine_threadsafe(
+        _consolidate_and_persist(user_id, state, get_openai_client()),
+        _get_event_loop(),
+    )
+    pending[user_id] = future
+
+    def _done(f: concurrent.futures.Future) -> None:
+        if not f.cancelled() and f.exception() is not None:
+            logger.error(f"Background consolidation crashed for {user_id}: {f.exception()}")
+        if pending.get(user_id) is f:
+            pending.pop(user_id, None)
+
+    future.add_done_callback(_done)
+
+
+def iter_async(agen):
+    """Iterate an async generator from sync code, stepping it on the shared loop."""
+    loop = _get_event_loop()
     try:
-        return loop.run_until_complete(coro)
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+            except StopAsyncIteration:
+                return
     finally:
-        loop.close()
+        # Runs when the consumer stops early too, so the agent run is cancelled cleanly
+        asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result()
+
+
+# Log panel reads are cached briefly so rapid reruns don't re-scan the log file
+@st.cache_data(ttl=5)
+def _cached_log_stats() -> dict:
+    return get_log_stats()
+
+
+@st.cache_data(ttl=5)
+def _cached_read_logs_and_errors(n_logs: int, n_errors: int) -> tuple[str, str]:
+    return read_logs_and_errors(n_logs, n_errors)
+
+
+def _clear_log_caches() -> None:
+    """Drop cached log reads so the next render sees the file as it is now."""
+    _cached_log_stats.clear()
+    _cached_read_logs_and_errors.clear()
+
+
+def _section_open(label: str, key: str) -> bool:
+    """Collapsible sidebar section toggle.
+
+    Unlike st.expander, whose body runs on every rerun even when collapsed,
+    callers only build the section's widgets while the toggle is on.
+    """
+    return st.toggle(label, key=f"section_{key}_open")
+
+
+@st.fragment
+def _profile_section(user_state: TravelState):
+    """Edit Profile form."""
+    profile = user_state.profile
+    if _section_open("✏️ Edit Profile", "profile"):
+        with st.form("profile_form"):
+            new_name = st.text_input("Name", value=profile.get("name", ""))
+            new_home_city = st.text_input("Home City", value=profile.get("home_city", ""))
+            new_currency = st.selectbox(
+                "Currency",
+                options=CURRENCIES,
+                index=CURRENCY_IDX.get(profile.get("currency", "USD"), 0)
+            )
+            new_tone = st.selectbox(
+                "Communication Tone",
+                options=TONE_OPTS,
+                index=TONE_IDX.get(profile.get("tone", "concise and friendly"), 0)
+            )
+
+            if st.form_submit_button("Save Profile"):
+                profile["name"] = new_name
+                profile["home_city"] = new_home_city
+                profile["currency"] = new_currency
+                profile["tone"] = new_tone
+                user_state.profile_version += 1
+                save_user_state(st.session_state.user_id, st.session_state.user_state)
+                st.success("Profile saved!")
+                st.rerun()
+
+
+@st.fragment
+def _flight_prefs_section(user_state: TravelState):
+    """Flight preferences form."""
+    profile = user_state.profile
+    flight_prefs = profile.get("flight_preferences", {})
+    home_airport = flight_prefs.get("home_airport")
+    if _section_open("✈️ Flight Preferences", "flight"):
+        with st.form("flight_prefs_form"):
+            new_home_airport = st.text_input(
+                "Home Airport (IATA code)",
+                value=home_airport or "",
+                placeholder="e.g., SFO, JFK, LAX"
+            )
+            new_seat = st.selectbox(
+                "Seat Preference",
+                options=SEAT_OPTS,
+                index=SEAT_IDX.get(flight_prefs.get("seat_preference", "aisle"), 0)
+            )
+            new_departure_time = st.selectbox(
+                "Preferred Departure Time",
+                options=DEP_TIME_OPTS,
+                index=DEP_TIME_IDX.get(flight_prefs.get("departure_time", "morning"), 0)
+            )
+            new_cabin = st.selectbox(
+                "Cabin Class",
+                options=CABIN_OPTS,
+                index=CABIN_IDX.get(flight_prefs.get("cabin_class", "economy"), 0)
+            )
+            new_max_layovers = st.selectbox(
+                "Maximum Layovers",
+                options=MAX_LAYOVER_OPTS,
+                index=MAX_LAYOVER_IDX.get(flight_prefs.get("max_layovers", 1), 1)
+            )
+            new_avoid_red_eye = st.checkbox(
+                "Avoid Red-Eye Flights",
+                value=flight_prefs.get("avoid_red_eye", True)
+            )
+
+            if st.form_submit_button("Save Flight Preferences"):
+                profile["flight_preferences"] = {
+                    "home_airport": new_home_airport.upper().strip(),
+                    "seat_preference": new_seat,
+                    "departure_time": new_departure_time,
+                    "cabin_class": new_cabin,
+                    "max_layovers": new_max_layovers,
+                    "avoid_red_eye": new_avoid_red_eye,
+                }
+                user_state.profile_version += 1
+                save_user_state(st.session_state.user_id, st.session_state.user_state)
+                st.success("Flight preferences saved!")
+                st.rerun()
+
+
+@st.fragment
+def _hotel_prefs_section(user_state: TravelState):
+    """Hotel preferences form."""
+    profile = user_state.profile
+    hotel_prefs = profile.get("hotel_preferences", {})
+    if _section_open("🏨 Hotel Preferences", "hotel"):
+        with st.form("hotel_prefs_form", clear_on_submit=False):
+            # Preferred brands as comma-separated
+            current_brands = ", ".join(hotel_prefs.get("preferred_brands", []))
+            new_brands_str = st.text_input(
+                "Preferred Brands (comma-separated)",
+                value=current_brands,
+                placeholder="e.g., Marriott, Hilton, Hyatt"
+            )
+            new_min_stars = st.selectbox(
+                "Minimum Stars",
+                options=MIN_STARS_OPTS,
+                index=MIN_STARS_IDX.get(hotel_prefs.get("min_stars", 4), 3)
+            )
+            new_hotel_on_airport = st.checkbox(
+                "Prefer On-Airport Hotels",
+                value=hotel_prefs.get("on_airport", False)
+            )
+            new_high_floor = st.checkbox(
+                "Prefer High Floor",
+                value=hotel_prefs.get("prefer_high_floor", True)
+            )
+            new_bed_type = st.selectbox(
+                "Bed Type",
+                options=BED_TYPE_OPTS,
+                index=BED_TYPE_IDX.get(hotel_prefs.get("bed_type", "king"), 0)
+            )
+            new_smoking = st.checkbox(
+                "Smoking Room",
+                value=hotel_prefs.get("smoking", False)
+            )
+
+            if st.form_submit_button("Save Hotel Preferences"):
+                # Parse brands
+                new_brands = [b.strip() for b in new_brands_str.split(",") if b.strip()]
+                profile["hotel_preferences"] = {
+                    "preferred_brands": new_brands,
+                    "min_stars": new_min_stars,
+                    "on_airport": new_hotel_on_airport,
+                    "prefer_high_floor": new_high_floor,
+                    "bed_type": new_bed_type,
+                    "smoking": new_smoking,
+                }
+                user_state.profile_version += 1
+                save_user_state(st.session_state.user_id, st.session_state.user_state)
+                st.success("Hotel preferences saved!")
+
+
+@st.fragment
+def _car_prefs_section(user_state: TravelState):
+    """Car rental preferences form."""
+    profile = user_state.profile
+    car_prefs = profile.get("car_preferences", {})
+    if _section_open("🚗 Car Rental Preferences", "car"):
+        with st.form("car_prefs_form", clear_on_submit=False):
+            new_car_size = st.selectbox(
+                "Preferred Size",
+                options=CAR_SIZE_OPTS,
+                index=CAR_SIZE_IDX.get(car_prefs.get("preferred_size", "midsize"), 1)
+            )
+            new_car_on_airport = st.checkbox(
+                "Prefer On-Airport Pickup",
+                value=car_prefs.get("on_airport", True)
+            )
+            # Preferred companies as comma-separated
+            current_companies = ", ".join(car_prefs.get("preferred_companies", []))
+            new_companies_str = st.text_input(
+                "Preferred Companies (comma-separated)",
+                value=current_companies,
+                placeholder="e.g., Enterprise, Hertz, National"
+            )
+
+            if st.form_submit_button("Save Car Preferences"):
+                # Parse companies
+                new_companies = [c.strip() for c in new_companies_str.split(",") if c.strip()]
+                profile["car_preferences"] = {
+                    "preferred_size": new_car_size,
+                    "on_airport": new_car_on_airport,
+                    "preferred_companies": new_companies,
+                }
+                user_state.profile_version += 1
+                save_user_state(st.session_state.user_id, st.session_state.user_state)
+                st.success("Car preferences saved!")
+
+
+def _program_rows(user_state: TravelState, programs: list, key_prefix: str) -> None:
+    """Loyalty program rows: an active toggle labelled with the program, and a delete button.
+
+    Two widgets per row, no st.columns layout containers.
+    """
+    for i, prog in enumerate(programs):
+        active = prog.get("active", False)
+        new_active = st.toggle(
+            f"**{prog['program']}** · {prog.get('status', 'Member')} · {prog.get('member_id', '')}",
+            value=active,
+            key=f"{key_prefix}_active_{i}",
+        )
+        if new_active != active:
+            prog["active"] = new_active
+            user_state.profile_version += 1
+            save_user_state(st.session_state.user_id, st.session_state.user_state)
+            st.rerun()
+        if st.button("🗑️ Remove", key=f"del_{key_prefix}_{i}"):
+            programs.pop(i)
+            user_state.profile_version += 1
+            save_user_state(st.session_state.user_id, st.session_state.user_state)
+            st.rerun()
+
+
+@st.fragment
+def _ff_programs_section(user_state: TravelState):
+    """Frequent flyer programs: active toggles, delete, add."""
+    profile = user_state.profile
+    ff_programs = profile.get("frequent_flyer_programs", [])
+    if _section_open(f"✈️ Frequent Flyer Programs ({len(ff_programs)})", "ff"):
+        if ff_programs:
+            _program_rows(user_state, ff_programs, "ff")
+        else:
+            st.write("No frequent flyer programs added.")
+
+        st.divider()
+        st.write("**Add New Program:**")
+        with st.form("add_ff_form"):
+            new_ff_program = st.text_input("Program Name", placeholder="e.g., United MileagePlus")
+            new_ff_id = st.text_input("Member ID", placeholder="e.g., AB123456")
+            new_ff_status = st.text_input("Status", placeholder="e.g., Gold, Platinum")
+            if st.form_submit_button("➕ Add Program"):
+                if new_ff_program.strip():
+                    ff_programs.append({
+                        "program": new_ff_program.strip(),
+                        "member_id": new_ff_id.strip(),
+                        "status": new_ff_status.strip() or "Member",
+                        "active": False
+                    })
+                    profile["frequent_flyer_programs"] = ff_programs
+                    user_state.profile_version += 1
+                    save_user_state(st.session_state.user_id, st.session_state.user_state)
+                    # New programs start inactive, so only this section's list changes
+                    st.rerun(scope="fragment")
+
+
+@st.fragment
+def _hotel_programs_section(user_state: TravelState):
+    """Hotel loyalty programs: active toggles, delete, add."""
+    profile = user_state.profile
+    hotel_programs = profile.get("hotel_loyalty_programs", [])
+    if _section_open(f"🏨 Hotel Loyalty Programs ({len(hotel_programs)})", "hotel_loyalty"):
+        if hotel_programs:
+            _program_rows(user_state, hotel_programs, "hotel")
+        else:
+            st.write("No hotel loyalty programs added.")
+
+        st.divider()
+        st.write("**Add New Program:**")
+        with st.form("add_hotel_form"):
+            new_hotel_program = st.text_input("Program Name", placeholder="e.g., Marriott Bonvoy")
+            new_hotel_id = st.text_input("Member ID", placeholder="e.g., MR998877")
+            new_hotel_status = st.text_input("Status", placeholder="e.g., Gold, Titanium")
+            if st.form_submit_button("➕ Add Program"):
+                if new_hotel_program.strip():
+                    hotel_programs.append({
+                        "program": new_hotel_program.strip(),
+                        "member_id": new_hotel_id.strip(),
+                        "status": new_hotel_status.strip() or "Member",
+                        "active": False
+                    })
+                    profile["hotel_loyalty_programs"] = hotel_programs
+                    user_state.profile_version += 1
+                    save_user_state(st.session_state.user_id, st.session_state.user_state)
+                    st.rerun(scope="fragment")
+
+
+@st.fragment
+def _global_memory_section(user_state: TravelState):
+    """Global memory notes with delete and add."""
+    global_notes = user_state.global_memory.get("notes", [])
+    if _section_open(f"Global Memory ({len(global_notes)} notes)", "global_memory"):
+        if global_notes:
+            for i, note in enumerate(global_notes):
+                col1, col2 = st.columns([4, 1])
+                with col1:
+                    st.write(f"• {note.get('text', '')}")
+                with col2:
+                    if st.button("🗑️", key=f"del_global_{i}", help="Delete this memory"):
+                        global_notes.pop(i)
+                        user_state.bump_global_memory_version()
+                        save_user_state(st.session_state.user_id, st.session_state.user_state)
+                        st.rerun()
+        else:
+            st.write("No global memories yet.")
+
+        # Add new global memory
+        st.divider()
+        new_memory = st.text_input("Add new memory:", key="new_global_memory", placeholder="e.g., Prefers vegetarian meals")
+        if st.button("➕ Add", key="add_global"):
+            if new_memory.strip():
+                from state import today_iso_utc
+                global_notes.append({
+                    "text": new_memory.strip(),
+                    "last_update_date": today_iso_utc(),
+                    "keywords": []
+                })
+                user_state.sort_global_notes()
+                user_state.bump_global_memory_version()
+                save_user_state(st.session_state.user_id, st.session_state.user_state)
+                st.rerun()
+
+
+@st.fragment
+def _session_memory_section(user_state: TravelState):
+    """Session memory notes with delete."""
+    session_notes = user_state.session_memory.get("notes", [])
+    if _section_open(f"Session Memory ({len(session_notes)} notes)", "session_memory"):
+        if session_notes:
+            for i, note in enumerate(session_notes):
+                col1, col2 = st.columns([4, 1])
+                with col1:
+                    st.write(f"• {note.get('text', '')}")
+                with col2:
+                    if st.button("🗑️", key=f"del_session_{i}", help="Delete this memory"):
+                        session_notes.pop(i)
+                        save_user_state(st.session_state.user_id, st.session_state.user_state)
+                        st.rerun()
+        else:
+            st.write("No session memories yet.")
+
+
+@st.fragment
+def _logs_section():
+    """Log error/warning summary and log viewer."""
+    log_stats = _cached_log_stats()
+
+    # Show error/warning count
+    if log_stats.get("exists"):
+        error_count = log_stats.get("errors", 0)
+        warning_count = log_stats.get("warnings", 0)
+
+        if error_count > 0 or warning_count > 0:
+            st.warning(f"⚠️ {error_count} errors, {warning_count} warnings")
+        else:
+            st.success("✅ No errors")
+
+        st.caption(f"Log size: {log_stats.get('size_kb', 0)} KB")
+
+    # View Logs
+    if _section_open("📋 View Logs", "logs"):
+        tab1, tab2 = st.tabs(["Errors Only", "All Logs"])
+        logs, errors = _cached_read_logs_and_errors(100, 50)
+
+        with tab1:
+            st.code(errors, language="log")
+
+        with tab2:
+            st.code(logs, language="log")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("🔄 Refresh Logs"):
+                _clear_log_caches()
+                st.rerun(scope="fragment")
+        with col2:
+            if st.button("🗑️ Clear Logs"):
+                clear_logs()
+                _clear_log_caches()
+                logger.info("Logs cleared by user")
+                st.success("Logs cleared!")
+                st.rerun(scope="fragment")
+
+
+@st.cache_data
+def _api_status() -> dict:
+    """Snapshot of which API keys are configured in the environment."""
+    amadeus_key = os.getenv("AMADEUS_API_KEY")
+    return {
+        "openai": bool(os.getenv("OPENAI_API_KEY")),
+        "amadeus": bool(amadeus_key and os.getenv("AMADEUS_API_SECRET") and "your_" not in amadeus_key),
+    }
+
+
+@st.fragment
+def _api_status_section():
+    """API key configuration status."""
+    if _section_open("🔌 API Status", "api_status"):
+        status = _api_status()
+
+        st.write("**OpenAI API:**", "✅ Configured" if status["openai"] else "❌ Missing")
+        st.write("**Amadeus API:**", "✅ Configured" if status["amadeus"] else "❌ Not configured")
+
+        if status["amadeus"]:
+            st.warning("⚠️ **Test Mode**: Prices & times are estimates. Verify on booking sites.")
+        else:
+            st.caption("Add Amadeus keys to .env for real-time pricing")
+
+        if st.button("🔄 Refresh Status"):
+            _api_status.clear()
+            st.rerun(scope="fragment")
 
 
 def display_sidebar():
@@ -157,9 +707,13 @@ def display_sidebar():
             st.write(f"👋 **{display_name}**")
         with col2:
             if st.button("Logout", key="logout_btn"):
+                user_state = st.session_state.user_state
+                if user_state.session_memory.get("notes"):
+                    # State is already on disk; the LLM merge runs on the shared loop
+                    # so logout doesn't wait a full completion round-trip
+                    _schedule_consolidation(st.session_state.user_id, user_state)
                 # Clear session state
-                for key in list(st.session_state.keys()):
-                    del st.session_state[key]
+                st.session_state.clear()
                 logger.info(f"User logged out: {display_name}")
                 st.rerun()
 
@@ -175,8 +729,9 @@ def display_sidebar():
 
         # Show key preferences summary
         flight_prefs = profile.get("flight_preferences", {})
-        if flight_prefs.get("home_airport"):
-            st.write(f"**Home Airport:** {flight_prefs.get('home_airport')}")
+        home_airport = flight_prefs.get("home_airport")
+        if home_airport:
+            st.write(f"**Home Airport:** {home_airport}")
 
         # Show active loyalty programs
         ff_programs = profile.get("frequent_flyer_programs", [])
@@ -193,299 +748,20 @@ def display_sidebar():
             for p in active_hotel:
                 st.write(f"  🏨 {p['program']} - {p['status']}")
 
-        # Edit Profile Section
-        with st.expander("✏️ Edit Profile", expanded=False):
-            with st.form("profile_form"):
-                new_name = st.text_input("Name", value=profile.get("name", ""))
-                new_home_city = st.text_input("Home City", value=profile.get("home_city", ""))
-                new_currency = st.selectbox(
-                    "Currency",
-                    options=["USD", "EUR", "GBP", "CAD", "AUD", "JPY"],
-                    index=["USD", "EUR", "GBP", "CAD", "AUD", "JPY"].index(profile.get("currency", "USD")) if profile.get("currency", "USD") in ["USD", "EUR", "GBP", "CAD", "AUD", "JPY"] else 0
-                )
-                new_tone = st.selectbox(
-                    "Communication Tone",
-                    options=["concise and friendly", "detailed and formal", "casual"],
-                    index=0
-                )
-
-                if st.form_submit_button("Save Profile"):
-                    profile["name"] = new_name
-                    profile["home_city"] = new_home_city
-                    profile["currency"] = new_currency
-                    profile["tone"] = new_tone
-                    save_user_state(st.session_state.user_id, st.session_state.user_state)
-                    st.success("Profile saved!")
-                    st.rerun()
-
-        # Flight Preferences Section
-        flight_prefs = profile.get("flight_preferences", {})
-        with st.expander("✈️ Flight Preferences", expanded=False):
-            with st.form("flight_prefs_form"):
-                new_home_airport = st.text_input(
-                    "Home Airport (IATA code)",
-                    value=flight_prefs.get("home_airport", ""),
-                    placeholder="e.g., SFO, JFK, LAX"
-                )
-                new_seat = st.selectbox(
-                    "Seat Preference",
-                    options=["aisle", "window", "middle"],
-                    index=["aisle", "window", "middle"].index(flight_prefs.get("seat_preference", "aisle")) if flight_prefs.get("seat_preference", "aisle") in ["aisle", "window", "middle"] else 0
-                )
-                new_departure_time = st.selectbox(
-                    "Preferred Departure Time",
-                    options=["morning", "afternoon", "evening", "no preference"],
-                    index=["morning", "afternoon", "evening", "no preference"].index(flight_prefs.get("departure_time", "morning")) if flight_prefs.get("departure_time", "morning") in ["morning", "afternoon", "evening", "no preference"] else 0
-                )
-                new_cabin = st.selectbox(
-                    "Cabin Class",
-                    options=["economy", "premium_economy", "business", "first"],
-                    index=["economy", "premium_economy", "business", "first"].index(flight_prefs.get("cabin_class", "economy")) if flight_prefs.get("cabin_class", "economy") in ["economy", "premium_economy", "business", "first"] else 0
-                )
-                new_max_layovers = st.selectbox(
-                    "Maximum Layovers",
-                    options=[0, 1, 2, 3],
-                    index=flight_prefs.get("max_layovers", 1) if flight_prefs.get("max_layovers", 1) in [0, 1, 2, 3] else 1
-                )
-                new_avoid_red_eye = st.checkbox(
-                    "Avoid Red-Eye Flights",
-                    value=flight_prefs.get("avoid_red_eye", True)
-                )
-
-                if st.form_submit_button("Save Flight Preferences"):
-                    profile["flight_preferences"] = {
-                        "home_airport": new_home_airport.upper().strip(),
-                        "seat_preference": new_seat,
-                        "departure_time": new_departure_time,
-                        "cabin_class": new_cabin,
-                        "max_layovers": new_max_layovers,
-                        "avoid_red_eye": new_avoid_red_eye,
-                    }
-                    save_user_state(st.session_state.user_id, st.session_state.user_state)
-                    st.success("Flight preferences saved!")
-                    st.rerun()
-
-        # Hotel Preferences Section
-        hotel_prefs = profile.get("hotel_preferences", {})
-        with st.expander("🏨 Hotel Preferences", expanded=False):
-            with st.form("hotel_prefs_form"):
-                # Preferred brands as comma-separated
-                current_brands = ", ".join(hotel_prefs.get("preferred_brands", []))
-                new_brands_str = st.text_input(
-                    "Preferred Brands (comma-separated)",
-                    value=current_brands,
-                    placeholder="e.g., Marriott, Hilton, Hyatt"
-                )
-                new_min_stars = st.selectbox(
-                    "Minimum Stars",
-                    options=[1, 2, 3, 4, 5],
-                    index=hotel_prefs.get("min_stars", 4) - 1 if hotel_prefs.get("min_stars", 4) in [1, 2, 3, 4, 5] else 3
-                )
-                new_hotel_on_airport = st.checkbox(
-                    "Prefer On-Airport Hotels",
-                    value=hotel_prefs.get("on_airport", False)
-                )
-                new_high_floor = st.checkbox(
-                    "Prefer High Floor",
-                    value=hotel_prefs.get("prefer_high_floor", True)
-                )
-                new_bed_type = st.selectbox(
-                    "Bed Type",
-                    options=["king", "queen", "double", "twin", "no preference"],
-                    index=["king", "queen", "double", "twin", "no preference"].index(hotel_prefs.get("bed_type", "king")) if hotel_prefs.get("bed_type", "king") in ["king", "queen", "double", "twin", "no preference"] else 0
-                )
-                new_smoking = st.checkbox(
-                    "Smoking Room",
-                    value=hotel_prefs.get("smoking", False)
-                )
-
-                if st.form_submit_button("Save Hotel Preferences"):
-                    # Parse brands
-                    new_brands = [b.strip() for b in new_brands_str.split(",") if b.strip()]
-                    profile["hotel_preferences"] = {
-                        "preferred_brands": new_brands,
-                        "min_stars": new_min_stars,
-                        "on_airport": new_hotel_on_airport,
-                        "prefer_high_floor": new_high_floor,
-                        "bed_type": new_bed_type,
-                        "smoking": new_smoking,
-                    }
-                    save_user_state(st.session_state.user_id, st.session_state.user_state)
-                    st.success("Hotel preferences saved!")
-                    st.rerun()
-
-        # Car Rental Preferences Section
-        car_prefs = profile.get("car_preferences", {})
-        with st.expander("🚗 Car Rental Preferences", expanded=False):
-            with st.form("car_prefs_form"):
-                new_car_size = st.selectbox(
-                    "Preferred Size",
-                    options=["compact", "midsize", "full-size", "suv", "luxury", "minivan"],
-                    index=["compact", "midsize", "full-size", "suv", "luxury", "minivan"].index(car_prefs.get("preferred_size", "midsize")) if car_prefs.get("preferred_size", "midsize") in ["compact", "midsize", "full-size", "suv", "luxury", "minivan"] else 1
-                )
-                new_car_on_airport = st.checkbox(
-                    "Prefer On-Airport Pickup",
-                    value=car_prefs.get("on_airport", True)
-                )
-                # Preferred companies as comma-separated
-                current_companies = ", ".join(car_prefs.get("preferred_companies", []))
-                new_companies_str = st.text_input(
-                    "Preferred Companies (comma-separated)",
-                    value=current_companies,
-                    placeholder="e.g., Enterprise, Hertz, National"
-                )
-
-                if st.form_submit_button("Save Car Preferences"):
-                    # Parse companies
-                    new_companies = [c.strip() for c in new_companies_str.split(",") if c.strip()]
-                    profile["car_preferences"] = {
-                        "preferred_size": new_car_size,
-                        "on_airport": new_car_on_airport,
-                        "preferred_companies": new_companies,
-                    }
-                    save_user_state(st.session_state.user_id, st.session_state.user_state)
-                    st.success("Car preferences saved!")
-                    st.rerun()
-
-        # Frequent Flyer Programs
-        with st.expander(f"✈️ Frequent Flyer Programs ({len(ff_programs)})", expanded=False):
-            if ff_programs:
-                for i, prog in enumerate(ff_programs):
-                    col1, col2, col3 = st.columns([1, 3, 1])
-                    with col1:
-                        new_active = st.checkbox(
-                            "Active",
-                            value=prog.get("active", False),
-                            key=f"ff_active_{i}",
-                            label_visibility="collapsed"
-                        )
-                        if new_active != prog.get("active", False):
-                            prog["active"] = new_active
-                            save_user_state(st.session_state.user_id, st.session_state.user_state)
-                            st.rerun()
-                    with col2:
-                        st.write(f"**{prog['program']}**")
-                        st.caption(f"{prog.get('status', 'Member')} · {prog.get('member_id', '')}")
-                    with col3:
-                        if st.button("🗑️", key=f"del_ff_{i}"):
-                            ff_programs.pop(i)
-                            save_user_state(st.session_state.user_id, st.session_state.user_state)
-                            st.rerun()
-            else:
-                st.write("No frequent flyer programs added.")
-
-            st.divider()
-            st.write("**Add New Program:**")
-            with st.form("add_ff_form"):
-                new_ff_program = st.text_input("Program Name", placeholder="e.g., United MileagePlus")
-                new_ff_id = st.text_input("Member ID", placeholder="e.g., AB123456")
-                new_ff_status = st.text_input("Status", placeholder="e.g., Gold, Platinum")
-                if st.form_submit_button("➕ Add Program"):
-                    if new_ff_program.strip():
-                        ff_programs.append({
-                            "program": new_ff_program.strip(),
-                            "member_id": new_ff_id.strip(),
-                            "status": new_ff_status.strip() or "Member",
-                            "active": False
-                        })
-                        profile["frequent_flyer_programs"] = ff_programs
-                        save_user_state(st.session_state.user_id, st.session_state.user_state)
-                        st.rerun()
-
-        # Hotel Loyalty Programs
-        with st.expander(f"🏨 Hotel Loyalty Programs ({len(hotel_programs)})", expanded=False):
-            if hotel_programs:
-                for i, prog in enumerate(hotel_programs):
-                    col1, col2, col3 = st.columns([1, 3, 1])
-                    with col1:
-                        new_active = st.checkbox(
-                            "Active",
-                            value=prog.get("active", False),
-                            key=f"hotel_active_{i}",
-                            label_visibility="collapsed"
-                        )
-                        if new_active != prog.get("active", False):
-                            prog["active"] = new_active
-                            save_user_state(st.session_state.user_id, st.session_state.user_state)
-                            st.rerun()
-                    with col2:
-                        st.write(f"**{prog['program']}**")
-                        st.caption(f"{prog.get('status', 'Member')} · {prog.get('member_id', '')}")
-                    with col3:
-                        if st.button("🗑️", key=f"del_hotel_{i}"):
-                            hotel_programs.pop(i)
-                            save_user_state(st.session_state.user_id, st.session_state.user_state)
-                            st.rerun()
-            else:
-                st.write("No hotel loyalty programs added.")
-
-            st.divider()
-            st.write("**Add New Program:**")
-            with st.form("add_hotel_form"):
-                new_hotel_program = st.text_input("Program Name", placeholder="e.g., Marriott Bonvoy")
-                new_hotel_id = st.text_input("Member ID", placeholder="e.g., MR998877")
-                new_hotel_status = st.text_input("Status", placeholder="e.g., Gold, Titanium")
-                if st.form_submit_button("➕ Add Program"):
-                    if new_hotel_program.strip():
-                        hotel_programs.append({
-                            "program": new_hotel_program.strip(),
-                            "member_id": new_hotel_id.strip(),
-                            "status": new_hotel_status.strip() or "Member",
-                            "active": False
-                        })
-                        profile["hotel_loyalty_programs"] = hotel_programs
-                        save_user_state(st.session_state.user_id, st.session_state.user_state)
-                        st.rerun()
+        # Each section is a fragment: its widgets rerun only that section
+        _profile_section(user_state)
+        _flight_prefs_section(user_state)
+        _hotel_prefs_section(user_state)
+        _car_prefs_section(user_state)
+        _ff_programs_section(user_state)
+        _hotel_programs_section(user_state)
 
         st.divider()
 
         st.header("🧠 Memory")
 
-        global_notes = user_state.global_memory.get("notes", [])
-        session_notes = user_state.session_memory.get("notes", [])
-
-        # Global Memory with edit/delete
-        with st.expander(f"Global Memory ({len(global_notes)} notes)", expanded=False):
-            if global_notes:
-                for i, note in enumerate(global_notes):
-                    col1, col2 = st.columns([4, 1])
-                    with col1:
-                        st.write(f"• {note.get('text', '')}")
-                    with col2:
-                        if st.button("🗑️", key=f"del_global_{i}", help="Delete this memory"):
-                            global_notes.pop(i)
-                            save_user_state(st.session_state.user_id, st.session_state.user_state)
-                            st.rerun()
-            else:
-                st.write("No global memories yet.")
-
-            # Add new global memory
-            st.divider()
-            new_memory = st.text_input("Add new memory:", key="new_global_memory", placeholder="e.g., Prefers vegetarian meals")
-            if st.button("➕ Add", key="add_global"):
-                if new_memory.strip():
-                    from state import today_iso_utc
-                    global_notes.append({
-                        "text": new_memory.strip(),
-                        "last_update_date": today_iso_utc(),
-                        "keywords": []
-                    })
-                    save_user_state(st.session_state.user_id, st.session_state.user_state)
-                    st.rerun()
-
-        with st.expander(f"Session Memory ({len(session_notes)} notes)", expanded=False):
-            if session_notes:
-                for i, note in enumerate(session_notes):
-                    col1, col2 = st.columns([4, 1])
-                    with col1:
-                        st.write(f"• {note.get('text', '')}")
-                    with col2:
-                        if st.button("🗑️", key=f"del_session_{i}", help="Delete this memory"):
-                            session_notes.pop(i)
-                            save_user_state(st.session_state.user_id, st.session_state.user_state)
-                            st.rerun()
-            else:
-                st.write("No session memories yet.")
+        _global_memory_section(user_state)
+        _session_memory_section(user_state)
 
         st.divider()
 
@@ -498,15 +774,19 @@ def display_sidebar():
 
         with col2:
             if st.button("🔄 Consolidate", help="Consolidate session memories into global"):
+                from agent import consolidate_memory
+
                 consolidate_memory(
                     st.session_state.user_state,
-                    st.session_state.client,
+                    get_openai_client(),
                 )
                 save_user_state(st.session_state.user_id, st.session_state.user_state)
                 st.success("Consolidated!")
                 st.rerun()
 
         if st.button("🗑️ Clear Chat", use_container_width=True):
+            from agent import create_session
+
             st.session_state.messages = []
             st.session_state.session = create_session(
                 st.session_state.user_state,
@@ -520,56 +800,8 @@ def display_sidebar():
         # Admin Section
         st.header("⚙️ Admin")
 
-        log_stats = get_log_stats()
-
-        # Show error/warning count
-        if log_stats.get("exists"):
-            error_count = log_stats.get("errors", 0)
-            warning_count = log_stats.get("warnings", 0)
-
-            if error_count > 0 or warning_count > 0:
-                st.warning(f"⚠️ {error_count} errors, {warning_count} warnings")
-            else:
-                st.success("✅ No errors")
-
-            st.caption(f"Log size: {log_stats.get('size_kb', 0)} KB")
-
-        # View Logs
-        with st.expander("📋 View Logs", expanded=False):
-            tab1, tab2 = st.tabs(["Errors Only", "All Logs"])
-
-            with tab1:
-                errors = read_errors(50)
-                st.code(errors, language="log")
-
-            with tab2:
-                logs = read_logs(100)
-                st.code(logs, language="log")
-
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("🔄 Refresh Logs"):
-                    st.rerun()
-            with col2:
-                if st.button("🗑️ Clear Logs"):
-                    clear_logs()
-                    logger.info("Logs cleared by user")
-                    st.success("Logs cleared!")
-                    st.rerun()
-
-        # API Status
-        with st.expander("🔌 API Status", expanded=False):
-            openai_key = os.getenv("OPENAI_API_KEY")
-            amadeus_key = os.getenv("AMADEUS_API_KEY")
-            amadeus_secret = os.getenv("AMADEUS_API_SECRET")
-
-            st.write("**OpenAI API:**", "✅ Configured" if openai_key else "❌ Missing")
-            st.write("**Amadeus API:**", "✅ Configured" if (amadeus_key and amadeus_secret and "your_" not in amadeus_key) else "❌ Not configured")
-
-            if amadeus_key and amadeus_secret and "your_" not in amadeus_key:
-                st.warning("⚠️ **Test Mode**: Prices & times are estimates. Verify on booking sites.")
-            else:
-                st.caption("Add Amadeus keys to .env for real-time pricing")
+        _logs_section()
+        _api_status_section()
 
 
 def display_chat():
@@ -588,27 +820,28 @@ def display_chat():
 
         logger.info(f"User input: {prompt[:100]}...")
 
-        # Get agent response
+        # Stream agent response as it is generated
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    response = run_async(
-                        run_agent_turn(
+            try:
+                from agent import run_agent_turn_stream
+
+                response = st.write_stream(
+                    iter_async(
+                        run_agent_turn_stream(
                             st.session_state.agent,
                             st.session_state.session,
                             st.session_state.user_state,
                             prompt,
                         )
                     )
-                    logger.info(f"Agent response received ({len(response)} chars)")
-                except Exception as e:
-                    error_msg = f"Error getting agent response: {str(e)}"
-                    logger.error(error_msg)
-                    logger.error(traceback.format_exc())
-                    response = f"Sorry, I encountered an error: {str(e)}"
-                    st.error(response)
-
-            st.markdown(response)
+                )
+                logger.info(f"Agent response received ({len(response)} chars)")
+            except Exception as e:
+                error_msg = f"Error getting agent response: {str(e)}"
+                logger.error(error_msg)
+                logger.error(traceback.format_exc())
+                response = f"Sorry, I encountered an error: {str(e)}"
+                st.error(response)
 
         # Add assistant message to display
         st.session_state.messages.append({"role": "assistant", "content": response})
@@ -1,44 +1,152 @@
 """Simple authentication module for Travel Concierge Agent."""
 
+import base64
 import hashlib
+import hmac
 import json
+import os
+import sys
+import tempfile
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 from logger import get_logger
 
 logger = get_logger(__name__)
 
 # Users file path
 USERS_FILE = Path(__file__).parent / "data" / "users.json"
+USERS_FILE.parent.mkdir(exist_ok=True)
+
+# Plain-str paths for the hot open/stat/replace calls
+_USERS_FILE_STR = str(USERS_FILE)
+
+# PBKDF2-HMAC-SHA256 work factor for password hashes
+PBKDF2_ITERATIONS = 100_000
+
+# Parsed users.json, reused while the file's mtime is unchanged. "records" is
+# a compact username -> (display_name, password_hash, salt) view of "data" for
+# read-only lookups, rebuilt lazily after the data changes.
+_USERS_CACHE = {"mtime": None, "data": {}, "records": None}
+
+
+@lru_cache(maxsize=1024)
+def _norm(username: str) -> str:
+    """Normalized (lowercased, interned) username used as the users-dict key."""
+    return sys.intern(username.lower())
+
+
+def _hash_password(password: str, salt: bytes) -> str:
+    """Hash a password using salted PBKDF2-HMAC-SHA256 (base64)."""
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, PBKDF2_ITERATIONS)
+    return base64.b64encode(digest).decode()
 
 
-def _hash_password(password: str) -> str:
-    """Hash a password using SHA-256."""
-    return hashlib.sha256(password.encode()).hexdigest()
+def _password_fields(password: str) -> dict:
+    """User record fields for a password, with a fresh random salt."""
+    salt = os.urandom(16)
+    return {
+        "salt": base64.b64encode(salt).decode(),
+        "password_hash": _hash_password(password, salt),
+    }
+
+
+def _verify_password(password: str, password_hash: str, salt: Optional[str]) -> bool:
+    """Check a password against a stored hash in constant time."""
+    if salt is None:
+        # Legacy record: unsalted SHA-256 hex digest
+        expected = hashlib.sha256(password.encode()).hexdigest()
+    else:
+        expected = _hash_password(password, base64.b64decode(salt))
+    return hmac.compare_digest(expected, password_hash)
 
 
 def _load_users() -> dict:
-    """Load users from JSON file."""
-    if not USERS_FILE.exists():
+    """Load users from JSON file (cached until the file changes)."""
+    try:
+        mtime = os.stat(_USERS_FILE_STR).st_mtime_ns
+    except FileNotFoundError:
         return {}
+    if _USERS_CACHE["mtime"] == mtime:
+        return _USERS_CACHE["data"]
     try:
-        with open(USERS_FILE, "r") as f:
-            return json.load(f)
+        with open(_USERS_FILE_STR, "rb") as f:
+            # mtime of the file actually read, in case it was replaced since the stat
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+            raw = f.read()
+        users = orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+    except FileNotFoundError:
+        return {}
     except Exception as e:
         logger.error(f"Error loading users: {e}")
         return {}
+    # Interned keys let lookups with _norm()'d names match by identity
+    users = {sys.intern(name): user for name, user in users.items()}
+    _USERS_CACHE["mtime"] = mtime
+    _USERS_CACHE["data"] = users
+    _USERS_CACHE["records"] = None
+    _display_name_cached.cache_clear()
+    return users
+
+
+def _compact_records(users: dict) -> dict[str, tuple[Optional[str], str, Optional[str]]]:
+    """Build the (display_name, password_hash, salt) tuples for each user."""
+    return {
+        name: (user.get("display_name"), user.get("password_hash", ""), user.get("salt"))
+        for name, user in users.items()
+    }
+
+
+def _user_records() -> dict[str, tuple[Optional[str], str, Optional[str]]]:
+    """Compact read-only view of the users file: username -> (display_name, password_hash, salt)."""
+    users = _load_users()
+    if users is not _USERS_CACHE["data"]:
+        # Missing or unreadable file; nothing cached to reuse
+        return _compact_records(users)
+    if _USERS_CACHE["records"] is None:
+        _USERS_CACHE["records"] = _compact_records(users)
+    return _USERS_CACHE["records"]
 
 
 def _save_users(users: dict) -> bool:
-    """Save users to JSON file."""
+    """Save users to JSON file atomically."""
+    tmp_path = None
     try:
-        USERS_FILE.parent.mkdir(exist_ok=True)
-        with open(USERS_FILE, "w") as f:
-            json.dump(users, f, indent=2)
+        if HAS_ORJSON:
+            buf = orjson.dumps(users, option=orjson.OPT_INDENT_2)
+        else:
+            buf = json.dumps(users, indent=2).encode()
+        # Write a per-call temp file, then swap it in: a crash never leaves a partial
+        # file, and concurrent saves can't truncate or replace each other's temp
+        fd, tmp_path = tempfile.mkstemp(dir=USERS_FILE.parent, prefix="users.", suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(buf)
+            f.flush()
+            os.fsync(f.fileno())
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+        os.replace(tmp_path, _USERS_FILE_STR)
+        tmp_path = None
+        _USERS_CACHE["mtime"] = mtime
+        _USERS_CACHE["data"] = users
+        _USERS_CACHE["records"] = None
+        _display_name_cached.cache_clear()
         return True
     except Exception as e:
         logger.error(f"Error saving users: {e}")
+        # Callers mutate the dict before saving; force a re-read from disk
+        _USERS_CACHE["mtime"] = None
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
         return False
 
 
@@ -51,15 +159,21 @@ def authenticate(username: str, password: str) -> bool:
     if not username or not password:
         return False
 
-    users = _load_users()
-    user = users.get(username.lower())
+    username_lower = _norm(username)
+    record = _user_records().get(username_lower)
 
-    if not user:
+    if record is None:
         logger.warning(f"Login attempt for non-existent user: {username}")
         return False
 
-    password_hash = _hash_password(password)
-    if user.get("password_hash") == password_hash:
+    _, password_hash, salt = record
+    if _verify_password(password, password_hash, salt):
+        if salt is None:
+            # Upgrade legacy SHA-256 hashes on the first successful login
+            users = _load_users()
+            users[username_lower].update(_password_fields(password))
+            _save_users(users)
+            logger.info(f"Password hash upgraded for user: {username}")
         logger.info(f"User logged in: {username}")
         return True
 
@@ -83,7 +197,7 @@ def create_user(username: str, password: str, display_name: str = "") -> tuple[b
         return False, "Password must be at least 4 characters"
 
     users = _load_users()
-    username_lower = username.lower()
+    username_lower = _norm(username)
 
     if username_lower in users:
         return False, "Username already exists"
@@ -91,7 +205,7 @@ def create_user(username: str, password: str, display_name: str = "") -> tuple[b
     users[username_lower] = {
         "username": username_lower,
         "display_name": display_name or username,
-        "password_hash": _hash_password(password),
+        **_password_fields(password),
     }
 
     if _save_users(users):
@@ -101,17 +215,23 @@ def create_user(username: str, password: str, display_name: str = "") -> tuple[b
     return False, "Error creating account"
 
 
+@lru_cache(maxsize=256)
+def _display_name_cached(username_lower: str) -> Optional[str]:
+    """Stored display name for a normalized username (None if unset or unknown)."""
+    record = _user_records().get(username_lower)
+    return None if record is None else record[0]
+
+
 def get_user_display_name(username: str) -> str:
     """Get the display name for a user."""
-    users = _load_users()
-    user = users.get(username.lower(), {})
-    return user.get("display_name", username)
+    display_name = _display_name_cached(_norm(username))
+    return username if display_name is None else display_name
 
 
 def user_exists(username: str) -> bool:
     """Check if a user exists."""
     users = _load_users()
-    return username.lower() in users
+    return _norm(username) in users
 
 
 def change_password(username: str, old_password: str, new_password: str) -> tuple[bool, str]:
@@ -120,19 +240,22 @@ def change_password(username: str, old_password: str, new_password: str) -> tupl
 
     Returns (success, message) tuple.
     """
-    if not authenticate(username, old_password):
+    # Verify against the same record we update: one load, one hash check, one save
+    users = _load_users()
+    user = users.get(_norm(username)) if username else None
+
+    if (
+        user is None
+        or not old_password
+        or not _verify_password(old_password, user.get("password_hash", ""), user.get("salt"))
+    ):
+        logger.warning(f"Failed password change for user: {username}")
         return False, "Current password is incorrect"
 
     if len(new_password) < 4:
         return False, "New password must be at least 4 characters"
 
-    users = _load_users()
-    username_lower = username.lower()
-
-    if username_lower not in users:
-        return False, "User not found"
-
-    users[username_lower]["password_hash"] = _hash_password(new_password)
+    user.update(_password_fields(new_password))
 
     if _save_users(users):
         logger.info(f"Password changed for user: {username}")
@@ -144,7 +267,7 @@ def change_password(username: str, old_password: str, new_password: str) -> tupl
 def delete_user(username: str) -> bool:
     """Delete a user account."""
     users = _load_users()
-    username_lower = username.lower()
+    username_lower = _norm(username)
 
     if username_lower not in users:
         return False
@@ -188,28 +311,42 @@ def _get_default_users() -> list:
     ]
 
 
-# Load users (cached at module level)
-DEFAULT_USERS = _get_default_users()
+# Loaded on first use so importing auth doesn't pull in streamlit
+DEFAULT_USERS: Optional[list] = None
+# Normalized username -> default profile, built alongside DEFAULT_USERS
+_DEFAULT_PROFILES: dict[str, dict] = {}
 
 
-def get_default_user_profile(username: str) -> dict:
-    """Get the default profile for a user if they're in the default users list."""
-    for user in DEFAULT_USERS:
-        if user["username"].lower() == username.lower():
-            return {
+def _default_users() -> list:
+    """Default users, resolved once on first call."""
+    global DEFAULT_USERS
+    if DEFAULT_USERS is None:
+        DEFAULT_USERS = _get_default_users()
+        _DEFAULT_PROFILES.update({
+            _norm(user["username"]): {
                 "home_airport": user.get("home_airport", ""),
                 "home_city": user.get("home_city", ""),
                 "display_name": user.get("display_name", ""),
             }
-    return {}
+            for user in DEFAULT_USERS
+        })
+    return DEFAULT_USERS
+
+
+def get_default_user_profile(username: str) -> dict:
+    """Get the default profile for a user if they're in the default users list."""
+    _default_users()
+    profile = _DEFAULT_PROFILES.get(_norm(username))
+    # Copy so callers can't alter the shared index
+    return dict(profile) if profile else {}
 
 
 def ensure_default_user():
     """Create default users if they don't exist."""
     users = _load_users()
 
-    for default_user in DEFAULT_USERS:
-        username = default_user["username"].lower()
+    for default_user in _default_users():
+        username = _norm(default_user["username"])
         if username not in users:
             create_user(
                 default_user["username"],
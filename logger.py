@@ -1,7 +1,12 @@
 """Logging configuration for Travel Concierge Agent."""
 
+import atexit
 import logging
+import mmap
 import os
+import queue
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 from pathlib import Path
 
@@ -12,17 +17,91 @@ LOGS_DIR.mkdir(exist_ok=True)
 # Log file path
 LOG_FILE = LOGS_DIR / "app.log"
 
+# Level markers as they appear in formatted lines
+_ERROR_MARK = b"| ERROR"
+_WARNING_MARK = b"| WARNING"
+
+# Userspace buffer for the log file; INFO/DEBUG records accumulate here
+LOG_BUFFER_SIZE = 64 * 1024
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders the timestamp once per second instead of per record.
+
+    Only used with a second-resolution datefmt; the default format includes msecs.
+    """
+
+    _cached: tuple[int, str] = (-1, "")
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        if datefmt is None:
+            return super().formatTime(record, datefmt)
+        sec = int(record.created)
+        cached_sec, cached = self._cached
+        if sec != cached_sec:
+            cached = super().formatTime(record, datefmt)
+            self._cached = (sec, cached)
+        return cached
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler that buffers writes and only flushes on WARNING and above.
+
+    The file is opened binary with O_APPEND: no text-layer newline translation,
+    and every flush is a single atomic append even with several processes logging.
+    """
+
+    def _open(self):
+        fd = os.open(self.baseFilename, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        return open(fd, "ab", buffering=LOG_BUFFER_SIZE)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            line = self.format(record) + self.terminator
+            self.stream.write(line.encode(self.encoding or "utf-8", self.errors or "strict"))
+            if record.levelno >= logging.WARNING:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+# Background thread that writes queued records to the real handlers
+_listener: QueueListener | None = None
+
+
+def _stop_listener() -> None:
+    """Drain queued records, stop the writer thread and close its handlers."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+# Flush anything still queued before the interpreter exits
+atexit.register(_stop_listener)
+
 
 def setup_logging():
-    """Configure application logging."""
+    """Configure application logging.
+
+    Loggers only enqueue records; a QueueListener thread does the formatting
+    and file/console writes, so callers never block on log I/O.
+    """
+    global _listener
     # Create formatter
-    formatter = logging.Formatter(
+    formatter = CachedTimeFormatter(
         "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S"
     )
 
     # File handler
-    file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+    file_handler = BufferedFileHandler(LOG_FILE, encoding="utf-8")
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(formatter)
 
@@ -35,10 +114,14 @@ def setup_logging():
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
 
-    # Remove existing handlers to avoid duplicates
-    root_logger.handlers = []
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    # Replace any previous setup instead of stacking listeners/handlers
+    _stop_listener()
+    _listener = QueueListener(
+        queue.SimpleQueue(), file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+
+    root_logger.handlers = [QueueHandler(_listener.queue)]
 
     return root_logger
 
@@ -48,16 +131,79 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
+def _flush_log_buffer() -> None:
+    """Write out buffered low-severity records so readers see the whole log."""
+    if _listener is not None:
+        for handler in _listener.handlers:
+            handler.flush()
+
+
+@contextmanager
+def _mapped_log():
+    """Read-only mmap of the log file (empty bytes for an empty file, which mmap rejects)."""
+    _flush_log_buffer()
+    with open(LOG_FILE, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _count(buf, needle: bytes) -> int:
+    """Count occurrences of needle in buf (mmap has no count())."""
+    n = 0
+    pos = buf.find(needle)
+    while pos >= 0:
+        n += 1
+        pos = buf.find(needle, pos + len(needle))
+    return n
+
+
+def _tail_start(buf, n: int) -> int:
+    """Offset where the last n lines of buf begin, found by scanning back from EOF."""
+    if n <= 0:
+        return 0
+    pos = len(buf)
+    if buf[-1:] == b"\n":
+        pos -= 1
+    for _ in range(n):
+        pos = buf.rfind(b"\n", 0, pos)
+        if pos < 0:
+            return 0
+    return pos + 1
+
+
+def _last_matching_lines(buf, needles: tuple[bytes, ...], n: int) -> list[bytes]:
+    """Last n lines of buf containing any of needles, found by scanning back from EOF."""
+    found = []
+    end = len(buf)
+    positions = {needle: buf.rfind(needle) for needle in needles}
+    while len(found) < n:
+        pos = max(positions.values())
+        if pos < 0:
+            break
+        start = buf.rfind(b"\n", 0, pos) + 1
+        stop = buf.find(b"\n", pos)
+        stop = len(buf) if stop < 0 else stop + 1
+        found.append(buf[start:stop])
+        end = start
+        # Each needle's search only ever moves backwards over unseen bytes
+        for needle, p in positions.items():
+            if p >= end:
+                positions[needle] = buf.rfind(needle, 0, end)
+    found.reverse()
+    return found
+
+
 def read_logs(lines: int = 100) -> str:
     """Read the last N lines from the log file."""
     if not LOG_FILE.exists():
         return "No logs yet."
 
     try:
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            all_lines = f.readlines()
-            recent_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
-            return "".join(recent_lines)
+        with _mapped_log() as mm:
+            return mm[_tail_start(mm, lines):].decode("utf-8")
     except Exception as e:
         return f"Error reading logs: {e}"
 
@@ -68,22 +214,38 @@ def read_errors(lines: int = 50) -> str:
         return "No logs yet."
 
     try:
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            all_lines = f.readlines()
-            error_lines = [
-                line for line in all_lines
-                if "| ERROR" in line or "| WARNING" in line
-            ]
-            recent_errors = error_lines[-lines:] if len(error_lines) > lines else error_lines
-            if not recent_errors:
-                return "No errors or warnings logged."
-            return "".join(recent_errors)
+        with _mapped_log() as mm:
+            recent_errors = _last_matching_lines(mm, (_ERROR_MARK, _WARNING_MARK), lines)
+        if not recent_errors:
+            return "No errors or warnings logged."
+        return b"".join(recent_errors).decode("utf-8")
     except Exception as e:
         return f"Error reading logs: {e}"
 
 
+def read_logs_and_errors(n_logs: int = 100, n_errors: int = 50) -> tuple[str, str]:
+    """Read the last N log lines and the last N ERROR/WARNING lines from one mapping.
+
+    Returns (logs, errors) with the same text read_logs/read_errors would give.
+    """
+    if not LOG_FILE.exists():
+        return "No logs yet.", "No logs yet."
+
+    try:
+        with _mapped_log() as mm:
+            logs = mm[_tail_start(mm, n_logs):].decode("utf-8")
+            recent_errors = _last_matching_lines(mm, (_ERROR_MARK, _WARNING_MARK), n_errors)
+        errors = b"".join(recent_errors).decode("utf-8") if recent_errors else "No errors or warnings logged."
+        return logs, errors
+    except Exception as e:
+        msg = f"Error reading logs: {e}"
+        return msg, msg
+
+
 def clear_logs() -> bool:
     """Clear the log file."""
+    # Otherwise records buffered before the clear would land after it
+    _flush_log_buffer()
     try:
         with open(LOG_FILE, "w", encoding="utf-8") as f:
             f.write("")
@@ -98,11 +260,11 @@ def get_log_stats() -> dict:
         return {"exists": False, "size": 0, "errors": 0, "warnings": 0}
 
     try:
-        size = LOG_FILE.stat().st_size
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            content = f.read()
-            errors = content.count("| ERROR")
-            warnings = content.count("| WARNING")
+        # _mapped_log flushes the handler buffer first, so the mapping's length is current
+        with _mapped_log() as mm:
+            size = len(mm)
+            errors = _count(mm, _ERROR_MARK)
+            warnings = _count(mm, _WARNING_MARK)
 
         return {
             "exists": True,
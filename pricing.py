@@ -1,30 +1,39 @@
 """Amadeus API integration for real-time flight and hotel pricing."""
 
+from __future__ import annotations
+
+import copy
 import os
+import re
+import threading
+import time
 from datetime import datetime
-from typing import Optional
-from urllib.parse import quote, urlencode
-
-try:
-    import streamlit as st
-    HAS_STREAMLIT = True
-except ImportError:
-    HAS_STREAMLIT = False
-
-from amadeus import Client, ResponseError
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Mapping, Optional
+from urllib.parse import quote, quote_plus
 
 from logger import get_logger
 
+# amadeus and streamlit are imported on first use to keep `import pricing` light
+if TYPE_CHECKING:
+    from amadeus import Client, ResponseError
+
 
+@lru_cache(maxsize=32)
 def get_secret(key: str, default: str = None) -> str:
-    """Get secret from Streamlit secrets (cloud) or environment variables (local)."""
+    """Get secret from Streamlit secrets (cloud) or environment variables (local).
+
+    Read once per process; call get_secret.cache_clear() to pick up changed secrets.
+    """
     # Try Streamlit secrets first (for Streamlit Cloud deployment)
-    if HAS_STREAMLIT:
-        try:
-            if hasattr(st, 'secrets') and key in st.secrets:
-                return st.secrets[key]
-        except Exception:
-            pass
+    try:
+        import streamlit as st
+        if hasattr(st, 'secrets') and key in st.secrets:
+            return st.secrets[key]
+    except Exception:
+        # Not installed, or no secrets configured
+        pass
     # Fall back to environment variables (for local development)
     return os.getenv(key, default)
 
@@ -67,25 +76,32 @@ HOTEL_BRAND_URLS = {
     "radisson": "https://www.radissonhotels.com",
     "choice": "https://www.choicehotels.com",
 }
+# One case-insensitive pass over a hotel name for any known brand
+_BRAND_RE = re.compile("|".join(map(re.escape, HOTEL_BRAND_URLS)), re.IGNORECASE)
+
 
+# Search links are memoized per argument tuple (the same trip is often re-searched)
+URL_CACHE_SIZE = 512
 
+# Search-link templates; only the variable fields are quoted per call (same
+# encoding urlencode would produce). Parameters are in sorted order so the same
+# search always yields a byte-identical URL.
+GOOGLE_FLIGHTS_URL = "https://www.google.com/travel/flights?curr=USD&q={q}"
+GOOGLE_HOTELS_URL = "https://www.google.com/travel/hotels?dates={dates}&q={q}"
+BOOKING_COM_URL = "https://www.booking.com/searchresults.html?checkin={check_in}&checkout={check_out}&group_adults={adults}&ss={city}"
+HOTELS_COM_URL = "https://www.hotels.com/search.do?q-check-in={check_in}&q-check-out={check_out}&q-destination={city}"
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def _get_google_flights_url(origin: str, destination: str, departure_date: str, return_date: Optional[str] = None) -> str:
     """Generate Google Flights search URL."""
-    # Google Flights URL format
-    base_url = "https://www.google.com/travel/flights"
-    params = {
-        "q": f"flights from {origin} to {destination}",
-        "curr": "USD",
-    }
-    # Add dates to query
-    date_str = f" on {departure_date}"
+    q = f"flights from {origin} to {destination} on {departure_date}"
     if return_date:
-        date_str += f" returning {return_date}"
-    params["q"] += date_str
-
-    return f"{base_url}?{urlencode(params)}"
+        q += f" returning {return_date}"
+    return GOOGLE_FLIGHTS_URL.format(q=quote_plus(q))
 
 
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def _get_kayak_flights_url(origin: str, destination: str, departure_date: str, return_date: Optional[str] = None) -> str:
     """Generate Kayak flight search URL."""
     if return_date:
@@ -93,6 +109,7 @@ def _get_kayak_flights_url(origin: str, destination: str, departure_date: str, r
     return f"https://www.kayak.com/flights/{origin}-{destination}/{departure_date}"
 
 
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def _get_skyscanner_flights_url(origin: str, destination: str, departure_date: str, return_date: Optional[str] = None) -> str:
     """Generate Skyscanner flight search URL."""
     dep_date = departure_date.replace("-", "")[:6]  # YYYYMM format
@@ -102,52 +119,53 @@ def _get_skyscanner_flights_url(origin: str, destination: str, departure_date: s
     return f"https://www.skyscanner.com/transport/flights/{origin.lower()}/{destination.lower()}/{dep_date}/"
 
 
-def _get_airline_info(carrier_code: str) -> dict:
-    """Get airline name and URL from carrier code."""
+@lru_cache(maxsize=256)
+def _get_airline_info(carrier_code: str) -> Mapping[str, str]:
+    """Get airline name and URL from carrier code (cached; read-only view)."""
     info = AIRLINE_INFO.get(carrier_code.upper(), {})
-    return {
+    return MappingProxyType({
         "name": info.get("name", carrier_code),
         "url": info.get("url", f"https://www.google.com/search?q={carrier_code}+airline+booking"),
-    }
+    })
 
 
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def _get_google_hotels_url(city: str, check_in: str, check_out: str) -> str:
     """Generate Google Hotels search URL."""
-    params = {
-        "q": f"hotels in {city}",
-        "dates": f"{check_in}_{check_out}",
-    }
-    return f"https://www.google.com/travel/hotels?{urlencode(params)}"
+    return GOOGLE_HOTELS_URL.format(
+        q=quote_plus(f"hotels in {city}"),
+        dates=quote_plus(f"{check_in}_{check_out}"),
+    )
 
 
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def _get_booking_com_url(city: str, check_in: str, check_out: str, adults: int = 1) -> str:
     """Generate Booking.com search URL."""
-    params = {
-        "ss": city,
-        "checkin": check_in,
-        "checkout": check_out,
-        "group_adults": adults,
-    }
-    return f"https://www.booking.com/searchresults.html?{urlencode(params)}"
+    return BOOKING_COM_URL.format(
+        city=quote_plus(city),
+        check_in=quote_plus(check_in),
+        check_out=quote_plus(check_out),
+        adults=quote_plus(str(adults)),
+    )
 
 
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def _get_hotels_com_url(city: str, check_in: str, check_out: str) -> str:
     """Generate Hotels.com search URL."""
-    params = {
-        "q-destination": city,
-        "q-check-in": check_in,
-        "q-check-out": check_out,
-    }
-    return f"https://www.hotels.com/search.do?{urlencode(params)}"
+    return HOTELS_COM_URL.format(
+        city=quote_plus(city),
+        check_in=quote_plus(check_in),
+        check_out=quote_plus(check_out),
+    )
 
 
-def get_amadeus_client() -> Optional[Client]:
-    """Get Amadeus API client."""
-    api_key = get_secret("AMADEUS_API_KEY")
-    api_secret = get_secret("AMADEUS_API_SECRET")
+_client_lock = threading.Lock()
 
-    if not api_key or not api_secret:
-        return None
+
+@lru_cache(maxsize=1)
+def _build_amadeus_client(api_key: str, api_secret: str) -> Client:
+    """Construct the Amadeus client for a credential pair (cached: reuses its OAuth token)."""
+    from amadeus import Client
 
     return Client(
         client_id=api_key,
@@ -156,6 +174,53 @@ def get_amadeus_client() -> Optional[Client]:
     )
 
 
+def get_amadeus_client() -> Optional[Client]:
+    """Get the shared Amadeus API client."""
+    api_key = get_secret("AMADEUS_API_KEY")
+    api_secret = get_secret("AMADEUS_API_SECRET")
+
+    if not api_key or not api_secret:
+        return None
+
+    # lru_cache alone could build duplicate clients under concurrent first calls
+    with _client_lock:
+        return _build_amadeus_client(api_key, api_secret)
+
+
+def _reset_client_on_auth_error(error: ResponseError) -> None:
+    """Drop the cached client after a 401 so the next call starts with a fresh token."""
+    if getattr(error.response, "status_code", None) == 401:
+        _build_amadeus_client.cache_clear()
+
+
+_ttl_cache_lock = threading.Lock()
+
+
+def _ttl_get(cache: dict, key):
+    """Return the live value cached under `key`, or None if missing or expired."""
+    entry = cache.get(key)
+    if entry is None or entry[0] <= time.monotonic():
+        return None
+    return entry[1]
+
+
+def _ttl_put(cache: dict, key, value, ttl: float, maxsize: int) -> None:
+    """Cache `value` under `key` for `ttl` seconds, evicting the oldest entry when full."""
+    with _ttl_cache_lock:
+        cache.pop(key, None)
+        if len(cache) >= maxsize:
+            # Dicts keep insertion order, so the first key is the oldest write
+            cache.pop(next(iter(cache)), None)
+        cache[key] = (time.monotonic() + ttl, value)
+
+
+# Identical searches within a few minutes (e.g. a re-asked question) reuse the
+# last successful result; every caller gets its own deep copy of the cached dict
+SEARCH_CACHE_SIZE = 128
+SEARCH_TTL_SECONDS = 300
+_search_cache: dict[tuple, tuple[float, dict]] = {}
+
+
 def search_flights(
     origin: str,
     destination: str,
@@ -180,6 +245,14 @@ def search_flights(
     Returns:
         Dictionary with flight offers or error message
     """
+    origin_code = origin.upper()
+    destination_code = destination.upper()
+    cache_key = ("flights", origin_code, destination_code, departure_date,
+                 return_date or None, adults, cabin_class, max_results)
+    cached = _ttl_get(_search_cache, cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
     client = get_amadeus_client()
 
     if not client:
@@ -188,10 +261,12 @@ def search_flights(
             "setup_url": "https://developers.amadeus.com"
         }
 
+    from amadeus import ResponseError
+
     try:
         search_params = {
-            "originLocationCode": origin.upper(),
-            "destinationLocationCode": destination.upper(),
+            "originLocationCode": origin_code,
+            "destinationLocationCode": destination_code,
             "departureDate": departure_date,
             "adults": adults,
             "travelClass": cabin_class,
@@ -208,13 +283,15 @@ def search_flights(
         for offer in response.data:
             # Parse itineraries
             itineraries = []
-            carriers_in_offer = set()
+            # carrier code -> airline info, in first-seen order
+            carriers_in_offer: dict[str, Mapping[str, str]] = {}
             for itinerary in offer.get("itineraries", []):
                 segments = []
                 for segment in itinerary.get("segments", []):
                     carrier_code = segment["carrierCode"]
-                    carriers_in_offer.add(carrier_code)
-                    airline_info = _get_airline_info(carrier_code)
+                    airline_info = carriers_in_offer.get(carrier_code)
+                    if airline_info is None:
+                        airline_info = carriers_in_offer[carrier_code] = _get_airline_info(carrier_code)
                     segments.append({
                         "departure": {
                             "airport": segment["departure"]["iataCode"],
@@ -236,13 +313,10 @@ def search_flights(
                 })
 
             # Get booking links for all carriers in this offer
-            airline_booking_links = []
-            for carrier in carriers_in_offer:
-                info = _get_airline_info(carrier)
-                airline_booking_links.append({
-                    "name": info["name"],
-                    "url": info["url"],
-                })
+            airline_booking_links = [
+                {"name": info["name"], "url": info["url"]}
+                for info in carriers_in_offer.values()
+            ]
 
             flights.append({
                 "id": offer["id"],
@@ -259,20 +333,23 @@ def search_flights(
 
         # Generate search links for the overall search
         search_links = {
-            "google_flights": _get_google_flights_url(origin, destination, departure_date, return_date),
-            "kayak": _get_kayak_flights_url(origin, destination, departure_date, return_date),
-            "skyscanner": _get_skyscanner_flights_url(origin, destination, departure_date, return_date),
+            "google_flights": _get_google_flights_url(origin_code, destination_code, departure_date, return_date),
+            "kayak": _get_kayak_flights_url(origin_code, destination_code, departure_date, return_date),
+            "skyscanner": _get_skyscanner_flights_url(origin_code, destination_code, departure_date, return_date),
         }
 
-        return {
+        result = {
             "success": True,
             "count": len(flights),
             "flights": flights,
             "search_links": search_links,
             "citation": "⚠️ Prices and times are ESTIMATES from Amadeus test data - verify on booking sites for actual rates.",
         }
+        _ttl_put(_search_cache, cache_key, copy.deepcopy(result), SEARCH_TTL_SECONDS, SEARCH_CACHE_SIZE)
+        return result
 
     except ResponseError as e:
+        _reset_client_on_auth_error(e)
         logger.error(f"Amadeus flight search error: {e.response.body}")
         return {
             "error": f"Amadeus API error: {e.response.body}",
@@ -286,6 +363,12 @@ def search_flights(
         }
 
 
+# Hotel IDs per city barely change, so reuse them across searches for an hour
+CITY_HOTELS_CACHE_SIZE = 256
+CITY_HOTELS_TTL_SECONDS = 3600
+_city_hotels_cache: dict[str, tuple[float, list[str]]] = {}
+
+
 def search_hotels(
     city_code: str,
     check_in_date: str,
@@ -308,6 +391,13 @@ def search_hotels(
     Returns:
         Dictionary with hotel offers or error message
     """
+    city_key = city_code.upper()
+    cache_key = ("hotels", city_key, check_in_date, check_out_date,
+                 adults, rooms, max_results)
+    cached = _ttl_get(_search_cache, cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
     client = get_amadeus_client()
 
     if not client:
@@ -316,22 +406,28 @@ def search_hotels(
             "setup_url": "https://developers.amadeus.com"
         }
 
-    try:
-        # First, get hotels in the city
-        hotels_response = client.reference_data.locations.hotels.by_city.get(
-            cityCode=city_code.upper(),
-        )
-
-        if not hotels_response.data:
-            return {
-                "success": True,
-                "count": 0,
-                "hotels": [],
-                "message": f"No hotels found in {city_code}",
-            }
+    from amadeus import ResponseError
 
-        # Get hotel IDs (limit to avoid too many API calls)
-        hotel_ids = [h["hotelId"] for h in hotels_response.data[:20]]
+    try:
+        hotel_ids = _ttl_get(_city_hotels_cache, city_key)
+        if hotel_ids is None:
+            # First, get hotels in the city
+            hotels_response = client.reference_data.locations.hotels.by_city.get(
+                cityCode=city_key,
+            )
+
+            if not hotels_response.data:
+                return {
+                    "success": True,
+                    "count": 0,
+                    "hotels": [],
+                    "message": f"No hotels found in {city_code}",
+                }
+
+            # Get hotel IDs (limit to avoid too many API calls)
+            hotel_ids = [h["hotelId"] for h in hotels_response.data[:20]]
+            _ttl_put(_city_hotels_cache, city_key, hotel_ids,
+                     CITY_HOTELS_TTL_SECONDS, CITY_HOTELS_CACHE_SIZE)
 
         # Search for offers at these hotels
         offers_response = client.shopping.hotel_offers_search.get(
@@ -352,11 +448,11 @@ def search_hotels(
                 hotel_name = hotel.get("name", "Unknown")
 
                 # Try to find hotel brand URL
-                hotel_search_url = f"https://www.google.com/search?q={quote(hotel_name)}+book+hotel"
-                for brand, url in HOTEL_BRAND_URLS.items():
-                    if brand.lower() in hotel_name.lower():
-                        hotel_search_url = url
-                        break
+                brand_match = _BRAND_RE.search(hotel_name)
+                if brand_match:
+                    hotel_search_url = HOTEL_BRAND_URLS[brand_match.group(0).lower()]
+                else:
+                    hotel_search_url = f"https://www.google.com/search?q={quote(hotel_name)}+book+hotel"
 
                 hotels.append({
                     "hotel_id": hotel.get("hotelId"),
@@ -375,20 +471,23 @@ def search_hotels(
 
         # Generate search links for the overall search
         search_links = {
-            "google_hotels": _get_google_hotels_url(city_code, check_in_date, check_out_date),
-            "booking_com": _get_booking_com_url(city_code, check_in_date, check_out_date, adults),
-            "hotels_com": _get_hotels_com_url(city_code, check_in_date, check_out_date),
+            "google_hotels": _get_google_hotels_url(city_key, check_in_date, check_out_date),
+            "booking_com": _get_booking_com_url(city_key, check_in_date, check_out_date, adults),
+            "hotels_com": _get_hotels_com_url(city_key, check_in_date, check_out_date),
         }
 
-        return {
+        result = {
             "success": True,
             "count": len(hotels),
             "hotels": hotels,
             "search_links": search_links,
             "citation": "⚠️ Prices are ESTIMATES from Amadeus test data - verify on booking sites for actual rates.",
         }
+        _ttl_put(_search_cache, cache_key, copy.deepcopy(result), SEARCH_TTL_SECONDS, SEARCH_CACHE_SIZE)
+        return result
 
     except ResponseError as e:
+        _reset_client_on_auth_error(e)
         logger.error(f"Amadeus hotel search error: {e.response.body}")
         return {
             "error": f"Amadeus API error: {e.response.body}",
@@ -402,16 +501,31 @@ def search_hotels(
         }
 
 
+# Non-empty airport lookups keyed by normalized city name; codes don't go stale,
+# so entries only leave the cache by eviction
+AIRPORT_CODE_CACHE_SIZE = 512
+AIRPORT_CODE_TTL_SECONDS = float("inf")
+_airport_code_cache: dict[str, tuple[float, tuple[Mapping[str, str], ...]]] = {}
+
+
 def get_airport_code(city_name: str) -> dict:
     """
     Look up airport IATA code for a city.
 
+    Non-empty results are memoized per normalized city name; errors and empty results are not cached.
+
     Args:
         city_name: Name of the city (e.g., "San Francisco", "New York")
 
     Returns:
         Dictionary with airport codes or error message
     """
+    cache_key = " ".join(city_name.lower().split())
+    cached = _ttl_get(_airport_code_cache, cache_key)
+    if cached is not None:
+        # Fresh containers per call; the cached locations are read-only views
+        return {"success": True, "locations": [dict(loc) for loc in cached]}
+
     client = get_amadeus_client()
 
     if not client:
@@ -419,6 +533,8 @@ def get_airport_code(city_name: str) -> dict:
             "error": "Amadeus API not configured.",
         }
 
+    from amadeus import ResponseError
+
     try:
         response = client.reference_data.locations.get(
             keyword=city_name,
@@ -435,12 +551,17 @@ def get_airport_code(city_name: str) -> dict:
                 "country": loc.get("address", {}).get("countryName", ""),
             })
 
+        # An empty answer may be transient; never pin it for the life of the process
+        if locations:
+            _ttl_put(_airport_code_cache, cache_key, tuple(map(MappingProxyType, locations)),
+                     AIRPORT_CODE_TTL_SECONDS, AIRPORT_CODE_CACHE_SIZE)
         return {
             "success": True,
-            "locations": locations,
+            "locations": [dict(loc) for loc in locations],
         }
 
     except ResponseError as e:
+        _reset_client_on_auth_error(e)
         logger.error(f"Amadeus airport lookup error: {e.response.body}")
         return {
             "error": f"Amadeus API error: {e.response.body}",
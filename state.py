@@ -5,7 +5,7 @@ from typing import Any, Dict, List
 from datetime import datetime, timezone
 
 
-@dataclass
+@dataclass(slots=True)
 class MemoryNote:
     """A single memory note with metadata."""
     text: str
@@ -27,8 +27,22 @@ class MemoryNote:
             keywords=data.get("keywords", []),
         )
 
-
-@dataclass
+    @classmethod
+    def validate(cls, data: Any) -> "MemoryNote | None":
+        """Strictly build a note from untrusted data; None if the shape is wrong."""
+        if not isinstance(data, dict):
+            return None
+        text = data.get("text")
+        date = data.get("last_update_date")
+        keywords = data.get("keywords", [])
+        if not isinstance(text, str) or not text.strip() or not isinstance(date, str):
+            return None
+        if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+            return None
+        return cls(text=text, last_update_date=date, keywords=keywords)
+
+
+@dataclass(slots=True)
 class TravelState:
     """State object for the Travel Concierge Agent."""
 
@@ -51,6 +65,33 @@ class TravelState:
     # Flag for triggering session injection after context trimming
     inject_session_memories_next_turn: bool = False
 
+    # Bumped by any writer that mutates `profile` (invalidates rendered frontmatter)
+    profile_version: int = 0
+
+    def __post_init__(self) -> None:
+        # Writers append to notes unconditionally, so both lists must always exist
+        for memory in (self.global_memory, self.session_memory):
+            if memory.get("notes") is None:
+                memory["notes"] = []
+        # Only global notes feed the render caches; drop the key older saves wrote for session notes
+        self.global_memory.setdefault("version", 0)
+        self.session_memory.pop("version", None)
+
+    def sort_global_notes(self) -> None:
+        """
+        Keep global_memory["notes"] ordered newest-first by last_update_date.
+
+        Renderers rely on this order and only take the first k notes, so any
+        writer that adds or replaces global notes must call this afterwards.
+        """
+        self.global_memory.get("notes", []).sort(
+            key=lambda n: n.get("last_update_date", ""), reverse=True
+        )
+
+    def bump_global_memory_version(self) -> None:
+        """Record a mutation of global_memory["notes"] (invalidates rendered global memories)."""
+        self.global_memory["version"] = self.global_memory.get("version", 0) + 1
+
     def to_dict(self) -> dict:
         """Convert state to dictionary for JSON serialization."""
         return {
@@ -63,12 +104,15 @@ class TravelState:
     @classmethod
     def from_dict(cls, data: dict) -> "TravelState":
         """Create state from dictionary."""
-        return cls(
+        state = cls(
             profile=data.get("profile", {}),
             global_memory=data.get("global_memory", {"notes": []}),
             session_memory=data.get("session_memory", {"notes": []}),
             trip_history=data.get("trip_history", {"trips": []}),
         )
+        # Files written before notes were kept sorted may be in any order
+        state.sort_global_notes()
+        return state
 
 
 def get_default_user_state() -> TravelState:
@@ -190,4 +234,6 @@ def get_default_user_state() -> TravelState:
 
 def today_iso_utc() -> str:
     """Get today's date in ISO format."""
-    return datetime.now(timezone.utc).strftime("%Y-%m-%dT")
+    # Formatting the fields directly skips strftime's locale-aware machinery
+    d = datetime.now(timezone.utc)
+    return f"{d.year:04d}-{d.month:02d}-{d.day:02d}T"
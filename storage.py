@@ -1,18 +1,32 @@
 """JSON file-based storage for user state persistence."""
 
 import json
+import os
+import tempfile
 from pathlib import Path
 from typing import Optional
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 from state import TravelState, get_default_user_state
 from auth import get_default_user_profile
 
 DATA_DIR = Path(__file__).parent / "data"
 
+_data_dir_ready = False
+
 
 def ensure_data_dir() -> None:
-    """Ensure the data directory exists."""
+    """Ensure the data directory exists (checked once per process)."""
+    global _data_dir_ready
+    if _data_dir_ready:
+        return
     DATA_DIR.mkdir(exist_ok=True)
+    _data_dir_ready = True
 
 
 def get_user_file_path(user_id: str) -> Path:
@@ -26,8 +40,8 @@ def load_user_state(user_id: str) -> TravelState:
     file_path = get_user_file_path(user_id)
 
     if file_path.exists():
-        with open(file_path, "r") as f:
-            data = json.load(f)
+        raw = file_path.read_bytes()
+        data = orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
         return TravelState.from_dict(data)
 
     # Create default state for new users
@@ -47,18 +61,37 @@ def load_user_state(user_id: str) -> TravelState:
 
 
 def save_user_state(user_id: str, state: TravelState) -> None:
-    """Save user state to JSON file."""
+    """Save user state to JSON file atomically."""
     ensure_data_dir()
     file_path = get_user_file_path(user_id)
 
-    with open(file_path, "w") as f:
-        json.dump(state.to_dict(), f, indent=2)
+    if HAS_ORJSON:
+        buf = orjson.dumps(state.to_dict(), option=orjson.OPT_INDENT_2)
+    else:
+        buf = json.dumps(state.to_dict(), indent=2).encode()
+    # Write a per-call temp file, then swap it in: a crash never leaves a partial
+    # state file, and concurrent saves of the same user can't clobber each other's temp
+    fd, tmp_path = tempfile.mkstemp(dir=DATA_DIR, prefix=f"{user_id}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(buf)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
 
 
 def list_users() -> list[str]:
     """List all user IDs with saved state."""
     ensure_data_dir()
-    return [f.stem for f in DATA_DIR.glob("*.json")]
+    # scandir hands back file types from the directory read itself (no per-file stat)
+    with os.scandir(DATA_DIR) as it:
+        return [e.name[:-5] for e in it if e.name.endswith(".json") and e.is_file()]
 
 
 def delete_user_state(user_id: str) -> bool: